@@ -0,0 +1,183 @@
+import hashlib
+import sqlite3
+import threading
+import time
+
+from dedup import canonical_url
+from entry import Entry
+from snapshot import Snapshot
+
+# SQLite-backed article history. Entries are keyed by their source and
+# canonical link (falling back to the GUID), so each poll only inserts new articles and
+# rewrites the ones whose content changed; articles that rotate out of a feed
+# stay queryable. It has the same publish()/snapshot() interface as
+# SnapshotStore, and a poller running in another process can share the file.
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    link_key TEXT NOT NULL UNIQUE,
+    guid TEXT,
+    link TEXT NOT NULL,
+    title TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    source TEXT NOT NULL,
+    published INTEGER,
+    first_seen INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    tags TEXT NOT NULL DEFAULT '',
+    cluster TEXT
+);
+CREATE INDEX IF NOT EXISTS articles_published ON articles (published);
+CREATE INDEX IF NOT EXISTS articles_source_published ON articles (source, published);
+CREATE INDEX IF NOT EXISTS articles_guid ON articles (guid);
+CREATE INDEX IF NOT EXISTS articles_cluster ON articles (cluster);
+CREATE TABLE IF NOT EXISTS feed_errors (
+    source TEXT PRIMARY KEY,
+    error TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+'''
+
+# Most recent articles returned by snapshot() unless configured otherwise
+snapshot_limit = 2000
+
+
+# The same article carried by two sources is stored once per source, as the
+# poller's timeline keeps it, so neither overwrites the other's text
+def row_key(entry):
+    key = canonical_url(entry.link) if entry.link else entry.guid
+    return f"{entry.source}\t{key}" if key else None
+
+
+def content_hash(entry):
+    published = entry.published_ts if entry.published_ts is not None else ''
+    text = f"{entry.title}\x00{entry.summary}\x00{published}\x00{','.join(entry.tags)}"
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+COLUMNS = 'link, guid, title, summary, source, published, tags, cluster'
+
+
+def row_to_entry(row):
+    link, guid, title, summary, source, published, tags, cluster = row
+    return Entry(title, link, summary, source, published, guid, tuple(tags.split(',')) if tags else (), cluster)
+
+
+class ArticleStore:
+    # publish() adds to the stored history rather than replacing it
+    incremental = True
+
+    def __init__(self, path, limit=snapshot_limit, max_age_hours=None):
+        self.path = path
+        self.limit = limit
+        self.max_age_hours = max_age_hours
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self._known = dict(self._conn.execute('SELECT link_key, content_hash FROM articles'))
+        self._writes = 0
+        self._cached_version = None
+        self._cached_snapshot = None
+
+    # Insert new articles and update changed ones. Entries whose content hash
+    # is already stored are skipped before touching SQLite.
+    # Returns the number of rows written.
+    def upsert(self, entries):
+        rows = []
+        now = int(time.time())
+        for entry in entries:
+            key = row_key(entry)
+            if not key:
+                continue
+            digest = content_hash(entry)
+            if self._known.get(key) == digest:
+                continue
+            rows.append((key, entry.guid, entry.link, entry.title, entry.summary, entry.source,
+                         entry.published_ts, now, ','.join(entry.tags), entry.cluster, digest))
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany('''
+                INSERT INTO articles (link_key, guid, link, title, summary, source, published, first_seen, tags, cluster, content_hash)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (link_key) DO UPDATE SET
+                    guid = excluded.guid, link = excluded.link, title = excluded.title,
+                    summary = excluded.summary, published = excluded.published,
+                    tags = excluded.tags, cluster = COALESCE(articles.cluster, excluded.cluster),
+                    content_hash = excluded.content_hash
+                WHERE articles.content_hash != excluded.content_hash
+            ''', rows)
+            self._writes += 1
+        for row in rows:
+            self._known[row[0]] = row[-1]
+        return len(rows)
+
+    def publish(self, entries, errors=None):
+        self.upsert(entries)
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM feed_errors')
+            self._conn.executemany('INSERT INTO feed_errors (source, error) VALUES (?, ?)', (errors or {}).items())
+            self._conn.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES ('published_at', ?)", (time.time(),))
+            self._writes += 1
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def latest(self, limit=snapshot_limit, source=None):
+        if source is None:
+            rows = self._query(f'SELECT {COLUMNS} FROM articles ORDER BY published IS NULL, published DESC LIMIT ?', (limit,))
+        else:
+            rows = self._query(f'SELECT {COLUMNS} FROM articles WHERE source = ? ORDER BY published IS NULL, published DESC LIMIT ?', (source, limit))
+        return [row_to_entry(row) for row in rows]
+
+    # Articles published in the last hours; undated ones count from when we
+    # first saw them
+    def since(self, hours, limit=snapshot_limit):
+        cutoff = int(time.time() - hours * 3600)
+        rows = self._query(f'SELECT {COLUMNS} FROM articles '
+                           'WHERE published >= ? OR (published IS NULL AND first_seen >= ?) '
+                           'ORDER BY published IS NULL, published DESC LIMIT ?', (cutoff, cutoff, limit))
+        return [row_to_entry(row) for row in rows]
+
+    # PRAGMA data_version only changes for writes from other connections, so
+    # combine it with our own write counter to know when to re-query
+    def _version(self):
+        with self._lock:
+            return self._conn.execute('PRAGMA data_version').fetchone()[0], self._writes
+
+    def snapshot(self):
+        version = self._version()
+        if version == self._cached_version:
+            return self._cached_snapshot
+        if self.max_age_hours:
+            entries = self.since(self.max_age_hours, self.limit)
+        else:
+            entries = self.latest(self.limit)
+        errors = dict(self._query('SELECT source, error FROM feed_errors'))
+        published_at = self._query("SELECT value FROM store_meta WHERE key = 'published_at'")
+        snapshot = Snapshot(entries, errors, published_at[0][0] if published_at else None)
+        self._cached_version, self._cached_snapshot = version, snapshot
+        return snapshot
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+# Return the process-wide store for path
+def open_article_store(path, **kwargs):
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = ArticleStore(path, **kwargs)
+        return _stores[path]
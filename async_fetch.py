@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+import feedparser
+
+from feeds import fetch_timeout, process_response, failed_result
+
+# asyncio/aiohttp fetch backend. All requests share one connection pool with
+# HTTP/1.1 keep-alive, so sources on the same host (rp.pl, gazeta.pl,
+# wyborcza) reuse connections instead of repeating TLS handshakes. The pool
+# caps open connections globally and per host, and every request has a hard
+# total timeout. The event loop runs on its own thread and lives as long as
+# the backend, keeping the pool warm between polls. Parsing is CPU bound and
+# runs on a worker pool so it never stalls the loop.
+
+max_connections = 20
+max_connections_per_host = 4
+
+
+class AsyncFetchBackend:
+    def __init__(self, max_connections=max_connections, per_host=max_connections_per_host,
+                 timeout=fetch_timeout, parse_workers=4):
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.timeout = timeout
+        self._parse_pool = ThreadPoolExecutor(max_workers=parse_workers, thread_name_prefix='feed-parse')
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='feed-fetch-loop', daemon=True)
+        self._thread.start()
+        self._session = None
+
+    async def _ensure_session(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.per_host,
+                                             enable_cleanup_closed=True)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'User-Agent': feedparser.USER_AGENT},
+            )
+        return self._session
+
+    async def _fetch(self, name, rss_url, previous):
+        request_headers = {}
+        if previous and previous['etag']:
+            request_headers['If-None-Match'] = previous['etag']
+        if previous and previous['modified']:
+            request_headers['If-Modified-Since'] = previous['modified']
+        fetch_started = time.perf_counter()
+        status = None
+        try:
+            session = await self._ensure_session()
+            async with session.get(rss_url, headers=request_headers) as response:
+                status = response.status
+                if status != 304:
+                    response.raise_for_status()
+                body = await response.read()
+                headers = {key.lower(): value for key, value in response.headers.items()}
+        except Exception as e:
+            return failed_result(name, rss_url, e, previous, time.perf_counter() - fetch_started, status)
+        fetch_seconds = time.perf_counter() - fetch_started
+        try:
+            return await self._loop.run_in_executor(
+                self._parse_pool, process_response, name, status, body, headers, previous, fetch_seconds)
+        except Exception as e:
+            return failed_result(name, rss_url, e, previous, fetch_seconds, status)
+
+    async def _fetch_many(self, jobs):
+        results = await asyncio.gather(*(self._fetch(name, rss_url, previous) for name, rss_url, previous in jobs))
+        return {job[0]: result for job, result in zip(jobs, results)}
+
+    # jobs is a list of (name, rss_url, previous); returns {name: result}
+    def fetch_many(self, jobs):
+        jobs = list(jobs)
+        return asyncio.run_coroutine_threadsafe(self._fetch_many(jobs), self._loop).result()
+
+    async def _close_session(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self._close_session(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._parse_pool.shutdown()
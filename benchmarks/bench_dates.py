@@ -0,0 +1,112 @@
+import argparse
+import os
+import re
+import timeit
+from datetime import datetime
+
+import dates
+from dates import DateNormalizer
+from benchmarks.record_fixtures import default_fixtures
+from benchmarks.stub_server import load_fixtures
+
+# Compare the original parse_date (regex plus up to six strptime attempts per
+# call) with the memoized, per-source learned path in dates.py, on the date
+# strings of the feeds recorded by benchmarks.record_fixtures.
+#
+#     python -m benchmarks.record_fixtures
+#     python -m benchmarks.bench_dates [--fixtures benchmarks/fixtures]
+#
+# A corpus file with one "source<TAB>date string" per line can be given with
+# --corpus instead. Without fixtures or a corpus, a built-in sample in the
+# shapes our feeds publish is used.
+
+SAMPLE_CORPUS = [
+    ("Energetyka24", "Tue, 04 Jun 2024 10:15:00 +0200"),
+    ("Green News", "Tue, 04 Jun 2024 08:00:12 GMT"),
+    ("WNP", "Tue, 04 Jun 2024 09:41:00"),
+    ("Biznes Alert", "Tue, 04 Jun 2024 07:05:32 +0000"),
+    ("CIRE", "Tue, 04 Jun 2024 11:20 CEST"),
+    ("Kierunek Energetyka", "Tue, 04 Jun 2024 11:20"),
+    ("Teraz Srodowisko", "04/06/2024 - 12:30"),
+    ("RP Energetyka", "Tue, 04 Jun 2024 10:00:00 GMT"),
+    ("Bankier", "Tue, 04 Jun 2024 12:44:01 +0200"),
+    ("Gazeta", "Tue, 04 Jun 2024 12:40:00 GMT"),
+]
+
+# Item dates in RSS (pubDate, dc:date) and Atom (published, updated) feeds
+_DATE_ELEMENT_RE = re.compile(
+    r'<(pubDate|dc:date|published|updated)>\s*(?:<!\[CDATA\[)?\s*(.*?)\s*(?:\]\]>)?\s*</\1>', re.DOTALL)
+
+
+def fixture_corpus(directory):
+    return [
+        (name, match.group(2))
+        for name, body in load_fixtures(directory)
+        for match in _DATE_ELEMENT_RE.finditer(body.decode('utf-8', 'replace'))
+    ]
+
+
+def original_parse_date(date_str):
+    date_str = re.sub(r'^[a-z]{2,3}\.,\s', '', date_str.lower(), flags=re.IGNORECASE)
+    for date_format in dates.DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, date_format)
+        except ValueError:
+            continue
+    raise ValueError(f"time data '{date_str}' does not match any known format")
+
+
+def load_corpus(path):
+    corpus = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if '\t' in line:
+                source, date_str = line.rstrip('\n').split('\t', 1)
+                corpus.append((source, date_str))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark published-date parsing.")
+    parser.add_argument('--fixtures', default=default_fixtures, help="recorded fixture directory")
+    parser.add_argument('--corpus', help="file with one 'source<TAB>date' per line, instead of the fixtures")
+    parser.add_argument('--repeat', type=int, default=200, help="passes over the corpus, like repeated polls")
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+    elif os.path.exists(os.path.join(args.fixtures, 'index.json')):
+        corpus = fixture_corpus(args.fixtures)
+    else:
+        print(f"no fixtures in {args.fixtures}, using the built-in sample")
+        corpus = SAMPLE_CORPUS
+    if not corpus:
+        parser.error("no date strings found")
+    strings = len(corpus) * args.repeat
+
+    def run_original():
+        for _, date_str in corpus:
+            try:
+                original_parse_date(date_str)
+            except ValueError:
+                pass
+
+    def run_cold():
+        dates._parse_string.cache_clear()
+        normalizer = DateNormalizer()
+        for source, date_str in corpus:
+            normalizer.normalize(None, date_str, source)
+
+    normalizer = DateNormalizer()
+
+    def run_warm():
+        for source, date_str in corpus:
+            normalizer.normalize(None, date_str, source)
+
+    for name, func in (('original', run_original), ('learned, cold cache', run_cold), ('learned, warm cache', run_warm)):
+        seconds = timeit.timeit(func, number=args.repeat)
+        print(f"{name:>20}: {seconds / strings * 1e6:8.2f} µs per date string")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+import argparse
+import statistics
+import time
+
+from feeds import ThreadPoolBackend, fetch_workers
+from async_fetch import AsyncFetchBackend, max_connections
+from benchmarks.stub_server import StubFeedServer
+
+# Compare wall-clock latency of the thread-pool and aiohttp fetch backends
+# against a local stub server. Every stub feed is served from 127.0.0.1,
+# while the real sources sit on different hosts, so the aiohttp per-host
+# connection limit defaults to the total limit here; pass --per-host to
+# measure it as configured.
+#
+#     python -m benchmarks.bench_fetch --feeds 35 --delay 0.2 --rounds 5
+#     python -m benchmarks.bench_fetch --max-workers 20 --connections 20 --per-host 4
+
+
+def run_rounds(backend, sources, rounds, revalidate):
+    timings = []
+    previous = {}
+    for _ in range(rounds):
+        jobs = [(name, url, previous.get(name) if revalidate else None) for name, url in sources.items()]
+        started = time.perf_counter()
+        results = backend.fetch_many(jobs)
+        timings.append(time.perf_counter() - started)
+        errors = [result['error'] for result in results.values() if result['error']]
+        if errors:
+            raise RuntimeError(errors[0])
+        previous = results
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the thread-pool and aiohttp fetch backends.")
+    parser.add_argument('--feeds', type=int, default=35)
+    parser.add_argument('--delay', type=float, default=0.2, help="seconds the stub server waits per request")
+    parser.add_argument('--items', type=int, default=30, help="items per stub feed")
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--revalidate', action='store_true', help="send validators so repeat rounds get 304s")
+    parser.add_argument('--max-workers', type=int, default=fetch_workers,
+                        help="threads of the thread-pool backend")
+    parser.add_argument('--connections', type=int, default=max_connections,
+                        help="connection limit of the aiohttp backend")
+    parser.add_argument('--per-host', type=int, default=None,
+                        help="per-host connection limit of the aiohttp backend (default: --connections)")
+    args = parser.parse_args()
+    per_host = args.per_host or args.connections
+
+    with StubFeedServer(delay=args.delay, items=args.items) as server:
+        sources = server.sources(args.feeds)
+        backends = {
+            'threads': ThreadPoolBackend(max_workers=args.max_workers),
+            'async': AsyncFetchBackend(max_connections=args.connections, per_host=per_host),
+        }
+        print(f"{args.feeds} feeds, {args.delay * 1000:.0f} ms delay, {args.rounds} rounds")
+        print(f"threads: {args.max_workers} workers; async: {args.connections} connections, {per_host} per host")
+        for name, backend in backends.items():
+            try:
+                timings = run_rounds(backend, sources, args.rounds, args.revalidate)
+            finally:
+                backend.close()
+            print(f"{name:>8}: median {statistics.median(timings) * 1000:8.1f} ms"
+                  f"  min {min(timings) * 1000:8.1f} ms  max {max(timings) * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
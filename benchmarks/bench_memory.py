@@ -0,0 +1,71 @@
+import argparse
+import gc
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from entry import Entry
+from benchmarks.bench_summary import make_description
+from html_text import summarize
+
+# Bytes per entry for the original six-key dicts (aware datetime plus an
+# eagerly formatted published_str) against slotted Entry objects.
+#
+#     python -m benchmarks.bench_memory --counts 10000 100000
+
+SOURCES = [f"Source {i}" for i in range(35)]
+TAGS = [(), ('sector',), ('orlen', 'sector'), ('wiatr', 'sector')]
+
+
+# Titles, links and summaries are built the way feedparser hands them over:
+# a fresh string per entry, the source name being the only shared string
+def _fields(i):
+    published = datetime(2024, 6, 1, tzinfo=timezone.utc) - timedelta(minutes=i)
+    return (
+        f"Tytuł artykułu numer {i} o transformacji energetycznej",
+        f"https://example.pl/artykul/{i}",
+        summarize(make_description(1)) + str(i),
+        ''.join(SOURCES[i % len(SOURCES)]),
+        published,
+    )
+
+
+def make_dict(i):
+    title, link, summary, source, published = _fields(i)
+    return {
+        'title': title,
+        'link': link,
+        'published': published,
+        'published_str': published.strftime('%a, %d %b %Y %H:%M'),
+        'summary': summary,
+        'source': source,
+    }
+
+
+def make_entry(i):
+    title, link, summary, source, published = _fields(i)
+    return Entry(title, link, summary, source, int(published.timestamp()), link, TAGS[i % len(TAGS)])
+
+
+def measure(factory, count):
+    gc.collect()
+    tracemalloc.start()
+    items = [factory(i) for i in range(count)]
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return current, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure memory per entry representation.")
+    parser.add_argument('--counts', type=int, nargs='+', default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    for count in args.counts:
+        for name, factory in (('dict', make_dict), ('Entry', make_entry)):
+            current, peak = measure(factory, count)
+            print(f"{count:>8} x {name:<6}: {current / count:8.1f} bytes/entry  (peak {peak / 2**20:7.1f} MiB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from itertools import count
+
+from feed_cache import feed_cache
+from poller import FeedPoller, make_backend, fetch_backend
+from article_store import ArticleStore
+from search_index import search_index, filter_entries
+from dedup import collapse_clusters
+from render import display_entries
+from benchmarks.report import latency_summary
+from benchmarks.stub_server import StubFeedServer
+
+# End-to-end benchmark of the path production runs: FeedPoller.poll_once
+# fetching every feed from the stub server and publishing into a fresh
+# ArticleStore (cold, then revalidating with 304s), followed by what a page
+# view costs in the app: the store snapshot, the search index sync, the
+# server-side filtering for a few typical filter settings and rendering the
+# first page. Runs for every combination of feed and item counts to show how
+# each stage scales.
+#
+#     python -m benchmarks.bench_pipeline --feeds 35 100 500 --items 30 100
+#     python -m benchmarks.bench_pipeline --fixtures benchmarks/fixtures --feeds 35 500
+
+# Hours of history the app reads from the store, as in app.py
+history_hours = 24
+
+
+# (label, sources fraction, tags, custom text) as chosen in the app's filters
+FILTER_CASES = [
+    ('all', 0, (), ''),
+    ('half of sources', 0.5, (), ''),
+    ('keyword', 0, ('orlen', 'wiatr'), ''),
+    ('sector', 0, ('sector',), ''),
+    ('custom text', 0, (), 'transformacja energetyczna'),
+]
+
+
+# Time each filter case, then the rendering of the unfiltered first page
+def run_filters(entries, source_names, page_size):
+    timings = {}
+    unfiltered = None
+    for label, fraction, tags, custom_text in FILTER_CASES:
+        selected = source_names[:int(len(source_names) * fraction)]
+        started = time.perf_counter()
+        stories = collapse_clusters(filter_entries(entries, search_index, selected, tags, custom_text))
+        timings[label] = time.perf_counter() - started
+        if unfiltered is None:
+            unfiltered = stories
+    started = time.perf_counter()
+    display_entries(unfiltered[:page_size])
+    return timings, time.perf_counter() - started
+
+
+# Every call is a day later, so every source is due on every poll
+def _day_clock():
+    days = count(1)
+    return lambda: next(days) * 86400.0
+
+
+# One page view after a poll: read the store, sync the index, filter, render
+def run_view(store, source_names, page_size):
+    started = time.perf_counter()
+    entries = store.snapshot().entries
+    snapshot_time = time.perf_counter() - started
+    started = time.perf_counter()
+    search_index.sync(entries)
+    index_time = time.perf_counter() - started
+    filter_times, render_time = run_filters(entries, source_names, page_size)
+    return entries, snapshot_time, index_time, filter_times, render_time
+
+
+# A poller starting from an empty cache and store polls every source twice:
+# a cold poll that downloads and parses everything, then a revalidating one
+def run_round(sources, backend, max_age_hours, page_size):
+    feed_cache.clear()
+    with tempfile.TemporaryDirectory() as directory:
+        store = ArticleStore(os.path.join(directory, 'articles.db'), max_age_hours=max_age_hours)
+        poller = FeedPoller(sources, store, backend=backend, clock=_day_clock())
+        started = time.perf_counter()
+        poller.poll_once()
+        poll_time = time.perf_counter() - started
+        started = time.perf_counter()
+        poller.poll_once()
+        repoll_time = time.perf_counter() - started
+        view = run_view(store, list(sources), page_size)
+        store.close()
+    return (poll_time, repoll_time) + view
+
+
+def benchmark(server, feeds, rounds, backend, max_age_hours, page_size, memory):
+    sources = server.sources(feeds)
+    timings = {label: [] for label in ('poll', 'repoll', 'snapshot', 'index sync', 'render page')}
+    filter_times = {label: [] for label, *_ in FILTER_CASES}
+    for _ in range(rounds):
+        poll_time, repoll_time, entries, snapshot_time, index_time, filters, render_time = run_round(
+            sources, backend, max_age_hours, page_size)
+        for label, elapsed in (('poll', poll_time), ('repoll', repoll_time), ('snapshot', snapshot_time),
+                               ('index sync', index_time), ('render page', render_time)):
+            timings[label].append(elapsed)
+        for label, elapsed in filters.items():
+            filter_times[label].append(elapsed)
+
+    print(f"  {'poll (cold)':<22}: {latency_summary(timings['poll'])}"
+          f"  {len(entries) / statistics.median(timings['poll']):8.0f} entries/s ({len(entries)} entries)")
+    print(f"  {'poll (revalidate)':<22}: {latency_summary(timings['repoll'])}")
+    print(f"  {'store snapshot':<22}: {latency_summary(timings['snapshot'])}")
+    print(f"  {'index sync':<22}: {latency_summary(timings['index sync'])}")
+    for label, elapsed in filter_times.items():
+        print(f"  {'filter ' + label:<22}: {latency_summary(elapsed)}")
+    print(f"  {'render page':<22}: {latency_summary(timings['render page'])}")
+    if memory:
+        tracemalloc.start()
+        run_round(sources, backend, max_age_hours, page_size)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"  {'peak memory':<22}: {peak / 2**20:8.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fetching, filtering and rendering end to end.")
+    parser.add_argument('--feeds', type=int, nargs='+', default=[35, 100, 500])
+    parser.add_argument('--items', type=int, nargs='+', default=[30], help="items per synthetic feed")
+    parser.add_argument('--paragraphs', type=int, default=3, help="description paragraphs per synthetic item")
+    parser.add_argument('--fixtures', help="serve recorded fixtures instead of synthetic feeds")
+    parser.add_argument('--delay', type=float, default=0.05, help="seconds the stub server waits per request")
+    parser.add_argument('--jitter', type=float, default=0.5, help="relative variation of the delay")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with a 503")
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--page-size', type=int, default=200, help="entries rendered per page")
+    parser.add_argument('--memory', action='store_true', help="also measure peak memory of one round (slow)")
+    parser.add_argument('--backend', choices=['threads', 'async'], default=fetch_backend, help="fetch engine")
+    args = parser.parse_args()
+
+    backend = make_backend(args.backend)
+    # Recorded fixtures are older than the app's history window, so their
+    # articles are read without it
+    max_age_hours = None if args.fixtures else history_hours
+
+    try:
+        for items in ([0] if args.fixtures else args.items):
+            with StubFeedServer(delay=args.delay, jitter=args.jitter, error_rate=args.error_rate, items=items,
+                                paragraphs=args.paragraphs, fixtures=args.fixtures,
+                                now=datetime.now(timezone.utc)) as server:
+                for feeds in args.feeds:
+                    print(f"{feeds} feeds, " + ("recorded fixtures" if args.fixtures else f"{items} items each")
+                          + f", {args.delay * 1000:.0f} ms delay, {args.rounds} rounds")
+                    benchmark(server, feeds, args.rounds, backend, max_age_hours, args.page_size, args.memory)
+    finally:
+        backend.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import re
+import timeit
+
+from html_text import summarize, summary_length
+
+# Compare the original clean_html + process_summary pipeline (three re.sub
+# passes over the whole description) with the single-pass summarize().
+#
+#     python -m benchmarks.bench_summary --paragraphs 5 40 200
+
+
+def clean_html(html):
+    html = re.sub(r'<img[^>]*>', '', html)
+    html = re.sub(r'<!--.*?-->', '', html, flags=re.DOTALL)
+    html = re.sub(r'<[^>]+>', '', html)
+    return html
+
+
+def process_summary(summary):
+    if '\n\n\n\n' in summary:
+        parts = summary.split('\n\n\n\n')
+        return parts[0] + ". " + parts[1]
+    else:
+        return summary
+
+
+# A description shaped like the large ones from Onet, WP and Business Insider:
+# a lead image, a tracking comment and many paragraphs with inline markup
+def make_description(paragraphs):
+    parts = ['<img src="https://ocdn.eu/images/lead.jpg" alt="Zdjęcie" width="640" height="360" />',
+             '<!-- tracking: begin --><span style="display:none">pixel</span><!-- tracking: end -->']
+    for i in range(paragraphs):
+        parts.append(
+            f'<p>Akapit {i}: Rząd przedstawił &quot;nowy plan&quot; dla <strong>energetyki</strong> '
+            f'&amp; <a href="https://example.pl/{i}">farm wiatrowych</a>.&nbsp;Ceny energii&hellip;</p>\n'
+        )
+    return ''.join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark summary extraction from feed HTML.")
+    parser.add_argument('--paragraphs', type=int, nargs='+', default=[5, 40, 200])
+    parser.add_argument('--number', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"summary_length = {summary_length}")
+    for paragraphs in args.paragraphs:
+        description = make_description(paragraphs)
+        original = timeit.timeit(lambda: process_summary(clean_html(description)), number=args.number)
+        single_pass = timeit.timeit(lambda: summarize(description), number=args.number)
+        print(f"{len(description):>8} bytes: original {original / args.number * 1e6:9.1f} µs"
+              f"  single pass {single_pass / args.number * 1e6:9.1f} µs")
+
+
+if __name__ == '__main__':
+    main()
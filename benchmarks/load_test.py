@@ -0,0 +1,151 @@
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+from benchmarks.bench_pipeline import FILTER_CASES
+from benchmarks.report import latency_summary
+from benchmarks.stub_server import StubFeedServer
+
+# Headless load test: many concurrent sessions rerunning the app against an
+# article store filled from the stub server, as an external poller would.
+#
+#     python -m benchmarks.load_test --sessions 20 --reruns 10
+#     python -m benchmarks.load_test --mode direct --sessions 100
+#
+# "apptest" runs app.py itself in streamlit.testing.v1.AppTest, changing
+# filters between reruns. AppTest instances share Streamlit's process-wide
+# Runtime and cannot run concurrently, so each session gets its own process,
+# like a deployment of several Streamlit processes reading one store; process
+# start-up counts towards the throughput. "direct" replays the same per-rerun
+# work (snapshot, index sync, filtering, rendering) without Streamlit on
+# threads, which isolates our own code and scales to more sessions.
+# Recorded fixtures older than the app's history window are not shown, so
+# apptest mode is best run with synthetic feeds.
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+
+
+def fill_store(server, feeds, db):
+    from feeds import sources, ThreadPoolBackend
+    from poller import FeedPoller
+    from article_store import ArticleStore
+
+    store = ArticleStore(db)
+    try:
+        poller = FeedPoller(server.sources(feeds, names=sources), store, backend=ThreadPoolBackend())
+        poller.poll_once()
+        poller.backend.close()
+        return len(store.latest())
+    finally:
+        store.close()
+
+
+# Runs in a worker process; returns the run timings
+def apptest_session(reruns, seed):
+    from streamlit.testing.v1 import AppTest
+    from keywords import original_keywords
+
+    rng = random.Random(seed)
+    timings = []
+    app = AppTest.from_file(APP_PATH, default_timeout=120)
+    started = time.perf_counter()
+    app.run()
+    timings.append(time.perf_counter() - started)
+    for _ in range(reruns):
+        action = rng.randrange(3)
+        if action == 0:
+            checkbox = app.checkbox(key=f'keyword_{rng.choice(original_keywords)}')
+            checkbox.set_value(not checkbox.value)
+        elif action == 1:
+            app.text_input(key='custom_filter').input(rng.choice(['', 'energetyka', 'wiatr', 'orlen']))
+        started = time.perf_counter()
+        app.run()
+        timings.append(time.perf_counter() - started)
+        if app.exception:
+            raise RuntimeError(app.exception[0].message)
+    return timings
+
+
+def direct_session(reruns, rng, timings, store, page_size=200):
+    from search_index import search_index, filter_entries
+    from dedup import collapse_clusters
+    from render import display_entries
+
+    for _ in range(reruns + 1):
+        _, fraction, tags, custom_text = rng.choice(FILTER_CASES)
+        started = time.perf_counter()
+        entries = store.snapshot().entries
+        search_index.sync(entries)
+        source_names = sorted({entry.source for entry in entries})
+        selected = source_names[:int(len(source_names) * fraction)]
+        stories = collapse_clusters(filter_entries(entries, search_index, selected, tags, custom_text))
+        display_entries(stories[:page_size])
+        timings.append(time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent app sessions against stub feeds.")
+    parser.add_argument('--mode', choices=['apptest', 'direct'], default='apptest')
+    parser.add_argument('--sessions', type=int, default=20,
+                        help="concurrent sessions (processes in apptest mode, threads in direct mode)")
+    parser.add_argument('--reruns', type=int, default=10, help="reruns per session after the first run")
+    parser.add_argument('--feeds', type=int, default=35)
+    parser.add_argument('--items', type=int, default=30, help="items per synthetic feed")
+    parser.add_argument('--fixtures', help="serve recorded fixtures instead of synthetic feeds")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = os.path.join(directory, 'articles.db')
+        # The app reads its store location and poller mode when it is imported
+        os.environ['RSS_DB'] = db
+        os.environ['RSS_EXTERNAL_POLLER'] = '1'
+        with StubFeedServer(items=args.items, fixtures=args.fixtures, now=datetime.now(timezone.utc)) as server:
+            articles = fill_store(server, args.feeds, db)
+
+        from article_store import ArticleStore
+        store = ArticleStore(db, max_age_hours=24)
+        timings = []
+        errors = []
+        started = time.perf_counter()
+        if args.mode == 'apptest':
+            # Workers inherit RSS_DB and RSS_EXTERNAL_POLLER from the environment
+            with ProcessPoolExecutor(max_workers=args.sessions,
+                                     mp_context=multiprocessing.get_context('spawn')) as executor:
+                futures = [executor.submit(apptest_session, args.reruns, args.seed + i) for i in range(args.sessions)]
+                for future in as_completed(futures):
+                    try:
+                        timings.extend(future.result())
+                    except Exception as e:
+                        errors.append(e)
+        else:
+            def session(index):
+                try:
+                    direct_session(args.reruns, random.Random(args.seed + index), timings, store)
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=session, args=(i,)) for i in range(args.sessions)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        elapsed = time.perf_counter() - started
+        store.close()
+
+    print(f"{args.mode}: {args.sessions} sessions x {args.reruns + 1} runs, {args.feeds} feeds, {articles} articles")
+    if timings:
+        print(f"  rerun latency  : {latency_summary(timings)}")
+        print(f"  throughput     : {len(timings) / elapsed:8.1f} reruns/s")
+    if errors:
+        print(f"  {len(errors)} sessions failed, first: {errors[0]!r}")
+
+
+if __name__ == '__main__':
+    main()
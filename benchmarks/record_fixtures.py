@@ -0,0 +1,61 @@
+import argparse
+import json
+import os
+import re
+
+from feeds import sources, download_feed, fetch_timeout
+from search_index import fold
+
+# Record the current XML of every source as a fixture, so benchmarks replay
+# real feeds from the stub server instead of hitting the live sites.
+#
+#     python -m benchmarks.record_fixtures [--out benchmarks/fixtures]
+#
+# The directory holds one <source>.xml per feed and an index.json mapping
+# source names to files, in the order of feeds.sources.
+
+default_fixtures = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def fixture_filename(name):
+    return re.sub(r'[^a-z0-9]+', '-', fold(name)).strip('-') + '.xml'
+
+
+def record(out, names, timeout):
+    os.makedirs(out, exist_ok=True)
+    index_path = os.path.join(out, 'index.json')
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path, encoding='utf-8') as f:
+            index = json.load(f)
+    for name in names:
+        try:
+            _, body, _ = download_feed(sources[name], None, None, timeout)
+        except Exception as e:
+            print(f"{name}: failed, {e}")
+            continue
+        filename = fixture_filename(name)
+        with open(os.path.join(out, filename), 'wb') as f:
+            f.write(body)
+        index[name] = filename
+        print(f"{name}: {len(body) / 1024:.1f} KiB")
+    index = {name: index[name] for name in sources if name in index}
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record feed snapshots as benchmark fixtures.")
+    parser.add_argument('--out', default=default_fixtures, help="fixture directory")
+    parser.add_argument('--sources', nargs='+', choices=list(sources), default=list(sources),
+                        help="sources to record (default: all)")
+    parser.add_argument('--timeout', type=float, default=fetch_timeout)
+    args = parser.parse_args()
+
+    index = record(args.out, args.sources, args.timeout)
+    print(f"{len(index)} fixtures in {args.out}")
+
+
+if __name__ == '__main__':
+    main()
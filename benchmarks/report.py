@@ -0,0 +1,10 @@
+import statistics
+
+from metrics import percentile
+
+# Latency summaries shared by the end-to-end benchmarks
+
+
+def latency_summary(timings):
+    return (f"p50 {statistics.median(timings) * 1000:8.1f} ms  p95 {percentile(timings, 0.95) * 1000:8.1f} ms"
+            f"  p99 {percentile(timings, 0.99) * 1000:8.1f} ms  max {max(timings) * 1000:8.1f} ms")
@@ -0,0 +1,158 @@
+import hashlib
+import html
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.bench_summary import make_description
+
+# Local HTTP server that serves RSS feeds with a configurable delay, jitter and
+# error rate, so fetch paths can be benchmarked without hitting the real
+# sources. Feeds are served at /feed/<n>.xml over HTTP/1.1 with keep-alive and
+# honour If-None-Match with a 304. They are synthetic, or the snapshots
+# recorded by benchmarks.record_fixtures: fixture n is served as feed n, and
+# feeds beyond the recorded ones replay them with the article hosts rewritten,
+# so every feed carries distinct links.
+
+
+# Start of an item link, GUID or Atom link/id URL, up to the host
+_ARTICLE_URL_RE = re.compile(
+    rb'<(?:link|guid|id)\b[^>]*>\s*(?:<!\[CDATA\[)?\s*https?://|<link\b[^>]*\bhref=["\']https?://')
+
+
+def make_feed(feed_id, items=30, paragraphs=0, now=None):
+    now = now or datetime(2024, 6, 1, 12, 0, tzinfo=timezone.utc)
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<rss version="2.0"><channel>',
+        f'<title>Stub feed {feed_id}</title><link>http://stub/{feed_id}</link><description>stub</description>',
+    ]
+    for i in range(items):
+        published = format_datetime(now - timedelta(minutes=7 * i + feed_id))
+        parts.append(
+            f'<item><title>Feed {feed_id} artykuł {i} o energetyce i OZE</title>'
+            f'<link>http://stub/{feed_id}/article-{i}</link>'
+            f'<guid>stub-{feed_id}-{i}</guid>'
+            f'<pubDate>{published}</pubDate>'
+            f'<description>&lt;p&gt;Streszczenie artykułu {i} z feedu {feed_id}. '
+            f'Transformacja energetyczna i farmy wiatrowe.&lt;/p&gt;'
+            f'{html.escape(make_description(paragraphs), quote=False) if paragraphs else ""}</description></item>'
+        )
+    parts.append('</channel></rss>')
+    return '\n'.join(parts).encode('utf-8')
+
+
+class StubFeedHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+        if not self.path.startswith('/feed/') or not self.path.endswith('.xml'):
+            self.send_error(404)
+            return
+        feed_id = int(self.path[len('/feed/'):-len('.xml')])
+        body = server.feed_body(feed_id)
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        delay = server.delay
+        if server.jitter:
+            delay *= server.random.uniform(1 - server.jitter, 1 + server.jitter)
+        if delay:
+            time.sleep(delay)
+        if server.error_rate and server.random.random() < server.error_rate:
+            self.send_error(503)
+            return
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubFeedServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The thread backend opens a connection per request; with socketserver's
+    # default backlog of 5 a burst overflows the listen queue and stalls on
+    # SYN retries
+    request_queue_size = 256
+
+    # delay: seconds before each response, varied by +/- jitter (a fraction);
+    # error_rate: fraction of requests answered with a 503; items and
+    # paragraphs: size of synthetic feeds, whose newest item is published at
+    # now; fixtures: a recorded fixture directory to serve instead
+    def __init__(self, port=0, delay=0.0, items=30, jitter=0.0, error_rate=0.0, paragraphs=0,
+                 fixtures=None, seed=0, now=None):
+        super().__init__(('127.0.0.1', port), StubFeedHandler)
+        self.delay = delay
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.items = items
+        self.paragraphs = paragraphs
+        self.now = now
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self._bodies = {}
+        self.fixtures = load_fixtures(fixtures) if fixtures else []
+
+    def feed_body(self, feed_id):
+        if feed_id not in self._bodies:
+            if self.fixtures:
+                name, body = self.fixtures[feed_id % len(self.fixtures)]
+                replica = feed_id // len(self.fixtures)
+                if replica:
+                    prefix = f'r{replica}.'.encode()
+                    body = _ARTICLE_URL_RE.sub(lambda match: match.group(0) + prefix, body)
+                self._bodies[feed_id] = body
+            else:
+                self._bodies[feed_id] = make_feed(feed_id, self.items, self.paragraphs, self.now)
+        return self._bodies[feed_id]
+
+    def url(self, feed_id):
+        return f'http://127.0.0.1:{self.server_address[1]}/feed/{feed_id}.xml'
+
+    # Source names to URLs. Feeds take the recorded source names (or names,
+    # e.g. feeds.sources, so the app's source filters match), the rest are
+    # named "Stub <n>".
+    def sources(self, count, names=()):
+        names = list(names) or [name for name, _ in self.fixtures]
+        return {
+            (names[i] if i < len(names) else f'Stub {i}'): self.url(i)
+            for i in range(count)
+        }
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+# [(source name, feed body)] in the order of the fixture index
+def load_fixtures(directory):
+    with open(os.path.join(directory, 'index.json'), encoding='utf-8') as f:
+        index = json.load(f)
+    fixtures = []
+    for name, filename in index.items():
+        with open(os.path.join(directory, filename), 'rb') as f:
+            fixtures.append((name, f.read()))
+    return fixtures
@@ -0,0 +1,96 @@
+import functools
+import logging
+import re
+import threading
+from datetime import datetime
+
+import pytz
+
+logger = logging.getLogger(__name__)
+
+# Published-date normalization. Each source tends to use one date format, so
+# the parser remembers the format that last worked for a source and tries it
+# first, and parsed strings are memoized because every poll sees the same
+# entries again.
+
+DATE_FORMATS = (
+    "%a, %d %b %Y %H:%M:%S %z",
+    "%a, %d %b %Y %H:%M:%S %Z",
+    "%a, %d %b %Y %H:%M:%S",
+    "%a, %d %b %Y %H:%M %Z",
+    "%a, %d %b %Y %H:%M",
+    "%d/%m/%Y - %H:%M",
+)
+
+# Timezone in which a source's date strings without an offset are expressed.
+# Unlisted sources are taken to publish such dates in UTC. feedparser's parsed
+# dates are always UTC and never go through this map.
+source_timezones = {
+    "WNP": pytz.UTC,
+}
+
+_WEEKDAY_PREFIX_RE = re.compile(r'^[a-z]{2,3}\.,\s', re.IGNORECASE)
+
+# Unparseable (source, date string) pairs, remembered process-wide so each
+# is logged once however many polls see it
+_MAX_REPORTED = 1024
+_reported = set()
+_reported_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=8192)
+def _parse_string(date_str, first_format):
+    date_str = _WEEKDAY_PREFIX_RE.sub('', date_str.lower())
+    order = DATE_FORMATS
+    if first_format is not None:
+        order = (first_format,) + tuple(f for f in DATE_FORMATS if f != first_format)
+    for date_format in order:
+        try:
+            return datetime.strptime(date_str, date_format), date_format
+        except ValueError:
+            continue
+    return None, None
+
+
+def parse_date(date_str):
+    parsed, _ = _parse_string(date_str, None)
+    if parsed is None:
+        raise ValueError(f"time data '{date_str}' does not match any known format")
+    return parsed
+
+
+class DateNormalizer:
+    def __init__(self, timezones=source_timezones):
+        self.timezones = timezones
+        self._lock = threading.Lock()
+        self._learned_formats = {}
+
+    def _localize(self, local_dt, source):
+        if local_dt.tzinfo is None:
+            return self.timezones.get(source, pytz.UTC).localize(local_dt).astimezone(pytz.UTC)
+        return local_dt.astimezone(pytz.UTC)
+
+    # Convert an entry's published date to an aware UTC datetime, preferring
+    # feedparser's parsed tuple. Returns None when the date cannot be parsed.
+    def normalize(self, published_parsed, published, source):
+        if published_parsed is not None:
+            return datetime(*published_parsed[:6], tzinfo=pytz.UTC)
+        if not published:
+            return None
+        parsed, date_format = _parse_string(published, self._learned_formats.get(source))
+        if parsed is None:
+            with _reported_lock:
+                if (source, published) in _reported:
+                    return None
+                if len(_reported) >= _MAX_REPORTED:
+                    _reported.clear()
+                _reported.add((source, published))
+            logger.warning("Failed to parse date %r from %s", published, source)
+            return None
+        if date_format != self._learned_formats.get(source):
+            with self._lock:
+                self._learned_formats[source] = date_format
+        return self._localize(parsed, source)
+
+
+date_normalizer = DateNormalizer()
@@ -0,0 +1,141 @@
+import hashlib
+import re
+import threading
+from collections import deque
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from search_index import tokenize
+
+# Cross-source deduplication. Links are canonicalized so tracking parameters
+# and mobile/AMP hosts do not hide identical URLs, and titles plus summaries
+# are fingerprinted with SimHash so the same wire story republished by several
+# portals lands in one cluster. Only entries not seen before are compared, and
+# only against a bounded window of recent fingerprints.
+
+_TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid', 'ref', 'src'}
+_MOBILE_HOST_RE = re.compile(r'^(?:m|mobile|amp)\.')
+
+
+# Lowercase scheme and host, drop www/mobile/AMP host prefixes, tracking
+# parameters, the fragment and the trailing slash
+def canonical_url(link):
+    parts = urlsplit(link.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    host = _MOBILE_HOST_RE.sub('', host)
+    path = parts.path
+    if path.endswith('/amp'):
+        path = path[:-4]
+    path = path.rstrip('/') or '/'
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in _TRACKING_PARAMS
+    ]
+    return urlunsplit((parts.scheme.lower(), host, path, urlencode(query), ''))
+
+
+def _feature_hash(feature):
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+# 64-bit SimHash over word unigrams and bigrams; title words count double
+def simhash(title, summary):
+    weights = {}
+    for tokens, weight in ((tokenize(title), 2), (tokenize(summary), 1)):
+        for token in tokens:
+            weights[token] = weights.get(token, 0) + weight
+        for bigram in zip(tokens, tokens[1:]):
+            feature = ' '.join(bigram)
+            weights[feature] = weights.get(feature, 0) + weight
+    if not weights:
+        return None
+    vector = [0] * 64
+    for feature, weight in weights.items():
+        value = _feature_hash(feature)
+        for bit in range(64):
+            if value >> bit & 1:
+                vector[bit] += weight
+            else:
+                vector[bit] -= weight
+    return sum(1 << bit for bit in range(64) if vector[bit] > 0)
+
+
+class StoryClusters:
+    # Fingerprints within max_distance bits of each other join a cluster.
+    # They are split into max_distance + 1 bands, so any such pair shares at
+    # least one band exactly and only entries in matching buckets are compared.
+    def __init__(self, max_distance=3, window=5000):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_bits = 64 // self.bands
+        self.window = window
+        self._lock = threading.Lock()
+        self._clusters = {}
+        self._recent = deque()
+        self._buckets = {}
+
+    def _band_keys(self, fingerprint):
+        mask = (1 << self.band_bits) - 1
+        return [(band, fingerprint >> (band * self.band_bits) & mask) for band in range(self.bands)]
+
+    def _remember(self, fingerprint, cluster):
+        keys = self._band_keys(fingerprint)
+        for key in keys:
+            self._buckets.setdefault(key, []).append((fingerprint, cluster))
+        self._recent.append((fingerprint, cluster, keys))
+        if len(self._recent) > self.window:
+            old_fingerprint, old_cluster, old_keys = self._recent.popleft()
+            for key in old_keys:
+                bucket = self._buckets[key]
+                bucket.remove((old_fingerprint, old_cluster))
+                if not bucket:
+                    del self._buckets[key]
+
+    def _nearest(self, fingerprint):
+        for key in self._band_keys(fingerprint):
+            for other, cluster in self._buckets.get(key, ()):
+                if bin(fingerprint ^ other).count('1') <= self.max_distance:
+                    return cluster
+        return None
+
+    # Set entry.cluster on every entry. Entries are visited oldest first,
+    # so a cluster is named after the earliest canonical URL of its story.
+    def assign(self, entries):
+        with self._lock:
+            for entry in reversed(entries):
+                url = canonical_url(entry.link)
+                cluster = self._clusters.get(url)
+                if cluster is None:
+                    fingerprint = simhash(entry.title, entry.summary)
+                    if fingerprint is not None:
+                        cluster = self._nearest(fingerprint)
+                    if cluster is None:
+                        cluster = url
+                    if fingerprint is not None:
+                        self._remember(fingerprint, cluster)
+                    self._clusters[url] = cluster
+                entry.cluster = cluster
+            if len(self._clusters) > self.window * 4:
+                live = {cluster for _, cluster, _ in self._recent}
+                self._clusters = {url: cluster for url, cluster in self._clusters.items() if cluster in live}
+        return entries
+
+
+# Collapse each cluster into its first (newest) entry. Returns a list of
+# (entry, sources) pairs, sources listing every source that carried the story.
+def collapse_clusters(entries):
+    collapsed = []
+    by_cluster = {}
+    for entry in entries:
+        cluster = entry.cluster or entry.link
+        sources = by_cluster.get(cluster)
+        if sources is None:
+            sources = by_cluster[cluster] = [entry.source]
+            collapsed.append((entry, sources))
+        elif entry.source not in sources:
+            sources.append(entry.source)
+    return collapsed
+
+
+story_clusters = StoryClusters()
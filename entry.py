@@ -0,0 +1,81 @@
+import sys
+import threading
+from datetime import datetime, timezone
+
+# Compact in-memory representation of an article. Slots avoid a per-entry
+# dict, the source is stored as a small integer id, tag tuples are shared
+# between entries with the same tags, the publication time is kept as epoch
+# seconds and only formatted when it is displayed, and a GUID equal to the
+# link is not stored twice.
+
+_sources_lock = threading.Lock()
+_source_ids = {}
+_source_names = []
+_tag_sets = {}
+
+# Sort key of entries without a publication date: after every dated entry
+MISSING_TIMESTAMP = -sys.maxsize
+
+
+def source_id(name):
+    source = _source_ids.get(name)
+    if source is None:
+        with _sources_lock:
+            source = _source_ids.get(name)
+            if source is None:
+                source = _source_ids[name] = len(_source_names)
+                _source_names.append(sys.intern(name))
+    return source
+
+
+def _shared_tags(tags):
+    tags = tuple(tags)
+    return _tag_sets.setdefault(tags, tags)
+
+
+class Entry:
+    __slots__ = ('title', 'link', '_guid', 'summary', '_source', 'published_ts', 'tags', 'cluster')
+
+    def __init__(self, title, link, summary, source, published_ts=None, guid=None, tags=(), cluster=None):
+        self.title = title
+        self.link = link
+        self._guid = None if guid == link else guid
+        self.summary = summary
+        self._source = source_id(source)
+        self.published_ts = published_ts
+        self.tags = _shared_tags(tags)
+        self.cluster = cluster
+
+    @property
+    def guid(self):
+        return self.link if self._guid is None else self._guid
+
+    @property
+    def source(self):
+        return _source_names[self._source]
+
+    @property
+    def published(self):
+        if self.published_ts is None:
+            return None
+        return datetime.fromtimestamp(self.published_ts, timezone.utc)
+
+    @property
+    def published_str(self):
+        if self.published_ts is None:
+            return 'Unknown'
+        return self.published.strftime('%a, %d %b %Y %H:%M')
+
+    # Pickle the source name, not this process's id for it, so snapshots
+    # can be read by another process
+    def __reduce__(self):
+        return Entry, (self.title, self.link, self.summary, self.source, self.published_ts, self.guid,
+                       self.tags, self.cluster)
+
+    def __repr__(self):
+        return f'Entry({self.source!r}, {self.title!r}, {self.published_ts!r})'
+
+
+# Newest first, undated entries last
+def sort_key(entry):
+    return entry.published_ts if entry.published_ts is not None else MISSING_TIMESTAMP
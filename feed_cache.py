@@ -0,0 +1,47 @@
+import threading
+
+# Process-wide store of the last fetch result of every feed. Streamlit
+# re-executes app.py on every rerun, so it lives in its own module, which is
+# imported once per process. The poller hands each source's previous result to
+# the next fetch so it can revalidate with a conditional GET, and the savings
+# of 304 responses are counted here.
+
+
+class FeedCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+        self.not_modified = 0
+        self.bytes_saved = 0
+        self.parse_seconds_saved = 0.0
+
+    # Return the stored result for key, or None
+    def peek(self, key):
+        with self._lock:
+            return self._values.get(key)
+
+    def put(self, key, value):
+        with self._lock:
+            self._values[key] = value
+
+    # Account for a 304 response that let us skip downloading and parsing
+    def record_not_modified(self, bytes_saved, parse_seconds_saved):
+        with self._lock:
+            self.not_modified += 1
+            self.bytes_saved += bytes_saved
+            self.parse_seconds_saved += parse_seconds_saved
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'not_modified': self.not_modified,
+                'bytes_saved': self.bytes_saved,
+                'parse_seconds_saved': self.parse_seconds_saved,
+            }
+
+
+feed_cache = FeedCache()
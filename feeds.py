@@ -0,0 +1,243 @@
+import feedparser
+import heapq
+import time
+import gzip
+import logging
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from feed_cache import feed_cache
+from keywords import tag_entry
+from dedup import story_clusters
+from dates import date_normalizer
+from html_text import summarize
+from entry import Entry, sort_key
+from metrics import feed_metrics, FetchRecord
+
+logger = logging.getLogger(__name__)
+
+# Define sources with manual names
+sources = {
+    "Energetyka24": "https://energetyka24.com/_rss",
+    "Green News": "https://www.green-news.pl/rss",
+    "WNP": "https://www.wnp.pl/rss/serwis_rss.xml",
+    "Biznes Alert": "https://biznesalert.pl/feed/",
+    "Zielona Gospodarka": "https://zielonagospodarka.pl/articles/rss",
+    "Teraz Srodowisko": "https://www.teraz-srodowisko.pl/rss/",
+    "Wysokie Napiecie": "https://wysokienapiecie.pl/feed/",
+    "CIRE": "https://www.cire.pl/rss/energetyka.xml",
+    "Kierunek Energetyka": "https://www.kierunekenergetyka.pl/rss.html",
+    "RP Energetyka": "https://energia.rp.pl/rss/4351-energetyka",
+    "Wyborcza Energetyka": "https://wyborcza.biz/pub/rss/wyborcza_biz_energetyka.xml",
+    "Offshore Wind Poland": "https://offshorewindpoland.pl/feed/",
+    "Gospodarka Morska": "https://www.gospodarkamorska.pl/articles/rss",
+    "Business Insider": "https://businessinsider.com.pl/.feed",
+    "Money": "https://www.money.pl/rss/",
+    "Puls Biznesu": "https://www.pb.pl/rss/najnowsze.xml?utm_source=RSS&utm_medium=RSS&utm_campaign=Z%20ostatniej%20chwili",
+    "Zielona Interia": "https://zielona.interia.pl/feed",
+    "Gazeta Prawna": "https://biznes.gazetaprawna.pl/.feed",
+    "Forbes": "https://www.forbes.pl/rss.xml",
+    "Bankier": "https://www.bankier.pl/rss/wiadomosci.xml",
+    "Gazeta": "https://www.gazeta.pl/pub/rss/wiadomosci.xml",
+    "Strefa Inwestorow": "https://strefainwestorow.pl/w-zielonej-strefie/rss.xml",
+    "300Gospodarka": "https://300gospodarka.pl/feed",
+    "Polsat News": "https://www.polsatnews.pl/rss/biznes.xml",
+    "RP Najnowsze": "https://rp.pl/rss_main?unknown-old-rss",
+    "Wyborcza Najnowsze": "https://rss.gazeta.pl/pub/rss/najnowsze_wyborcza.xml",
+    "TVN24 Biznes": "https://tvn24.pl/biznes.xml",
+    "Forsal": "https://forsal.pl/.feed",
+    "Onet": "https://wiadomosci.onet.pl/.feed",
+    "WP": "https://wiadomosci.wp.pl/rss.xml",
+    "Newsweek": "https://www.newsweek.pl/.feed",
+    "TOK FM": "https://www.tokfm.pl/pub/rss/tokfmpl_glowne.xml",
+    "Wprost": "https://www.wprost.pl/rss/wiadomosci",
+    "RMF24": "https://www.rmf24.pl/feed",
+    "300Polityka": "https://300polityka.pl/feed",
+}
+
+# Minimum seconds between polls of sources known to publish rarely
+feed_min_intervals = {
+    "Offshore Wind Poland": 1800,
+    "Teraz Srodowisko": 1800,
+    "Wysokie Napiecie": 900,
+    "Kierunek Energetyka": 900,
+}
+
+# Seconds to wait for a feed host before giving up on this poll
+fetch_timeout = 15
+
+# Feeds downloaded at once by the thread-pool backend
+fetch_workers = 10
+
+# Bytes requested per read of a feed body
+_READ_CHUNK = 65536
+
+# Read the body in chunks, giving up once the deadline has passed. The socket
+# timeout only bounds each read, so a host trickling its body a few bytes at a
+# time would otherwise hold the fetch (and the polling round) indefinitely.
+def _read_body(response, deadline, rss_url):
+    chunks = []
+    while True:
+        chunk = response.read1(_READ_CHUNK)
+        if not chunk:
+            return b''.join(chunks)
+        chunks.append(chunk)
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"reading {rss_url} took longer than the fetch timeout")
+
+# Download a feed, sending the validators from the previous poll so unchanged
+# feeds answer with an empty 304 instead of the full XML body. The whole
+# download is bounded by timeout, plus at most one socket timeout.
+def download_feed(rss_url, etag=None, modified=None, timeout=fetch_timeout):
+    deadline = time.monotonic() + timeout
+    request = urllib.request.Request(rss_url, headers={'User-Agent': feedparser.USER_AGENT, 'Accept-Encoding': 'gzip'})
+    if etag:
+        request.add_header('If-None-Match', etag)
+    if modified:
+        request.add_header('If-Modified-Since', modified)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            headers = {key.lower(): value for key, value in response.headers.items()}
+            body = _read_body(response, deadline, rss_url)
+            status = response.status
+    except urllib.error.HTTPError as e:
+        if e.code != 304:
+            raise
+        return 304, b'', {key.lower(): value for key, value in e.headers.items()}
+    if headers.get('content-encoding') == 'gzip':
+        body = gzip.decompress(body)
+    return status, body, headers
+
+# Seconds in each sy:updatePeriod unit
+_UPDATE_PERIODS = {'hourly': 3600, 'daily': 86400, 'weekly': 604800, 'monthly': 2592000, 'yearly': 31536000}
+
+def _positive_number(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number > 0 else None
+
+# Refresh hints published by the feed itself, in seconds: the RSS <ttl> (given
+# in minutes) and the sy:updatePeriod / sy:updateFrequency pair
+def update_hints(channel):
+    ttl = _positive_number(channel.get('ttl'))
+    period = _UPDATE_PERIODS.get(str(channel.get('sy_updateperiod', '')).strip().lower())
+    if period is not None:
+        period /= _positive_number(channel.get('sy_updatefrequency')) or 1
+    return (ttl * 60 if ttl else None), period
+
+# Parse a feed body into entries and the feed's refresh hints. Also returns the
+# seconds spent extracting summaries and the number of published dates that
+# could not be parsed.
+def parse_feed(name, body, headers):
+    filtered_entries = []
+    unique_entries = set()
+    summary_seconds = 0.0
+    date_failures = 0
+    feed = feedparser.parse(body, response_headers=headers)
+    for entry in feed.entries:
+        summary = entry.summary if 'summary' in entry else (entry.description if 'description' in entry else '')
+        summary_started = time.perf_counter()
+        summary = summarize(summary)
+        summary_seconds += time.perf_counter() - summary_started
+        entry_id = entry.link
+
+        if entry_id not in unique_entries:
+            unique_entries.add(entry_id)
+            published_dt = date_normalizer.normalize(entry.get('published_parsed'), entry.get('published'), name)
+            if published_dt is None and entry.get('published'):
+                date_failures += 1
+
+            filtered_entries.append(Entry(
+                entry.title,
+                entry.link,
+                summary,
+                name,
+                published_ts=int(published_dt.timestamp()) if published_dt else None,
+                guid=entry.get('id', entry.link),
+                tags=tag_entry(entry.title, summary),
+            ))
+    # Feeds list their items nearly newest first, so this is close to a
+    # linear pass, and the results can be merged without a global sort
+    filtered_entries.sort(key=sort_key, reverse=True)
+    return filtered_entries, update_hints(feed.feed), summary_seconds, date_failures
+
+# Turn a downloaded response into a feed result and record its metrics. A 304
+# reuses the previously parsed entries without touching the parser.
+def process_response(name, status, body, headers, previous=None, fetch_seconds=0.0):
+    if status == 304 and previous:
+        feed_cache.record_not_modified(previous['bytes'], previous['parse_time'])
+        feed_metrics.record(name, FetchRecord(fetch_seconds=fetch_seconds, status=304, entries_parsed=len(previous['entries'])))
+        return dict(previous, error=None)
+
+    parse_started = time.perf_counter()
+    entries, (ttl, update_period), summary_seconds, date_failures = parse_feed(name, body, headers)
+    parse_time = time.perf_counter() - parse_started
+    known = {entry.link for entry in previous['entries']} if previous else set()
+    feed_metrics.record(name, FetchRecord(
+        fetch_seconds=fetch_seconds, status=status, bytes=len(body), parse_seconds=parse_time,
+        entries_parsed=len(entries), entries_new=sum(1 for entry in entries if entry.link not in known),
+        summary_seconds=summary_seconds, date_failures=date_failures,
+    ))
+    return {
+        'entries': entries,
+        'etag': headers.get('etag'),
+        'modified': headers.get('last-modified'),
+        'bytes': len(body),
+        'parse_time': parse_time,
+        'ttl': ttl,
+        'update_period': update_period,
+        'error': None,
+    }
+
+# Failures are logged, recorded and reported through the 'error' key, keeping
+# the previously fetched entries when there are any
+def failed_result(name, rss_url, e, previous=None, fetch_seconds=0.0, status=None):
+    logger.error("Failed to process feed %s: %s", rss_url, e)
+    error = f"Failed to process feed {rss_url}: {e}"
+    feed_metrics.record(name, FetchRecord(fetch_seconds=fetch_seconds, status=status, error=error))
+    if previous:
+        return dict(previous, error=error)
+    return {'entries': [], 'etag': None, 'modified': None, 'bytes': 0, 'parse_time': 0.0,
+            'ttl': None, 'update_period': None, 'error': error}
+
+def fetch_feed(name, rss_url, previous=None, timeout=fetch_timeout):
+    etag = previous['etag'] if previous else None
+    modified = previous['modified'] if previous else None
+    fetch_started = time.perf_counter()
+    try:
+        status, body, headers = download_feed(rss_url, etag, modified, timeout)
+    except Exception as e:
+        status = e.code if isinstance(e, urllib.error.HTTPError) else None
+        return failed_result(name, rss_url, e, previous, time.perf_counter() - fetch_started, status)
+    fetch_seconds = time.perf_counter() - fetch_started
+    try:
+        return process_response(name, status, body, headers, previous, fetch_seconds)
+    except Exception as e:
+        return failed_result(name, rss_url, e, previous, fetch_seconds, status)
+
+# Default fetch backend: one urllib request per feed on a thread pool
+class ThreadPoolBackend:
+    def __init__(self, max_workers=fetch_workers, timeout=fetch_timeout):
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+    # jobs is a list of (name, rss_url, previous); returns {name: result}
+    def fetch_many(self, jobs):
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(fetch_feed, name, rss_url, previous, self.timeout): name
+                for name, rss_url, previous in jobs
+            }
+            return {futures[future]: future.result() for future in as_completed(futures)}
+
+    def close(self):
+        pass
+
+# Merge per-source entry lists, each already sorted newest first, into one
+# timeline with a k-way heap merge, and assign every entry to its
+# cross-source story cluster
+def merge_entries(entry_lists):
+    merged = list(heapq.merge(*entry_lists, key=sort_key, reverse=True))
+    return story_clusters.assign(merged)
@@ -0,0 +1,85 @@
+import html
+import re
+
+# Summary extraction from feed descriptions. One precompiled pattern removes
+# tags, images and comments in a single pass over a prefix of the markup that
+# grows only until it holds enough text for the summary, so large HTML
+# descriptions are not read to the end. Entities are decoded and whitespace
+# collapsed on that bounded text only.
+
+# Characters kept in a summary before it is cut at a word boundary
+summary_length = 500
+
+_MARKUP_RE = re.compile(r'<!--.*?-->|<[^>]*>', re.DOTALL)
+
+# Entities common in our feeds, replaced directly before falling back to
+# html.unescape for anything else
+_COMMON_ENTITIES = (
+    ('&nbsp;', '\xa0'), ('&quot;', '"'), ('&#39;', "'"), ('&apos;', "'"), ('&lt;', '<'), ('&gt;', '>'),
+    ('&hellip;', '…'), ('&ndash;', '–'), ('&mdash;', '—'), ('&bdquo;', '„'), ('&rdquo;', '”'),
+)
+
+# Some feeds separate a lead from the body with four newlines; the summary
+# keeps the first two blocks joined as sentences
+_BLOCK_SEPARATOR = '\n\n\n\n'
+
+# Raw characters first read per summary character, allowing for the markup,
+# entities and runs of whitespace that shrink when stripped and decoded
+_RAW_BUDGET_FACTOR = 4
+
+# Longest entity reference looked for when cutting, e.g. &CounterClockwiseContourIntegral;
+_MAX_ENTITY = 33
+
+
+# Move end back to before a tag, comment or entity that it would cut in half
+def _safe_cut(markup, end):
+    comment = markup.rfind('<!--', 0, end)
+    if comment != -1 and markup.find('-->', comment, end) == -1:
+        return comment
+    tag = markup.rfind('<', 0, end)
+    if tag != -1 and markup.find('>', tag, end) == -1:
+        return tag
+    entity = markup.rfind('&', max(end - _MAX_ENTITY, 0), end)
+    if entity != -1 and markup.find(';', entity, end) == -1:
+        return entity
+    return end
+
+
+# Strip markup from a growing prefix of the description until it yields
+# budget characters of text once entities are decoded and whitespace is
+# collapsed, or the whole description has been read. Returns the decoded text
+# and whether the description was read to the end.
+def _collect_text(markup, budget):
+    end = budget * _RAW_BUDGET_FACTOR
+    while end < len(markup):
+        text = _decode_entities(_MARKUP_RE.sub('', markup[:_safe_cut(markup, end)]))
+        if len(' '.join(text.split())) >= budget:
+            return text, False
+        end *= 2
+    return _decode_entities(_MARKUP_RE.sub('', markup)), True
+
+
+def _decode_entities(text):
+    if '&' not in text:
+        return text
+    decoded = text
+    for entity, char in _COMMON_ENTITIES:
+        if entity in decoded:
+            decoded = decoded.replace(entity, char)
+    if decoded.count('&') != decoded.count('&amp;'):
+        return html.unescape(text)
+    return decoded.replace('&amp;', '&')
+
+
+def summarize(markup, max_length=summary_length):
+    if not markup:
+        return ''
+    text, complete = _collect_text(markup, max_length + 1)
+    if _BLOCK_SEPARATOR in text:
+        parts = text.split(_BLOCK_SEPARATOR, 2)
+        text = parts[0] + ". " + parts[1]
+    text = ' '.join(text.split())
+    if len(text) <= max_length:
+        return text if complete else text + '…'
+    cut = text.rfind(' ', 0, max_length)
+    return text[:cut if cut > max_length // 2 else max_length].rstrip() + '…'
@@ -0,0 +1,190 @@
+import re
+
+from search_index import fold
+
+# Keyword sets behind the topic filters, compiled once into one regex per tag.
+# Entries are tagged when they are ingested, so switching filters on the page
+# is a set lookup instead of a scan over every keyword.
+
+# Define keywords for the original filters
+original_keywords = ["aramco", "lotos", "obajtek", "orlen", "energetyk", "wodor", "wiatr", "pv", "offshore", "ccs/ccus", "pfas"]
+
+# Define expanded list of keywords for the new "Wiadomości Sektorowe" button
+sector_keywords = [
+  "aramco", "lotos", "obajtek", "orlen", "energetyka", "energetyki", "energetyce", "energetykę", 
+    "wodór", "wodoru", "wodorem", "wiatr", "wiatru", "wiatrze", "wiatrak", "wiatraka", "wiatraku", 
+    "pv", "fotowoltaika", "fotowoltaiki", "fotowoltaice", "fotowoltaikę", "offshore", 
+    "ccs", "ccsu", "ccus", "pfas", 
+    "odnawialne źródła energii", "odnawialnych źródeł energii", "odnawialnym źródłom energii", 
+    "energia słoneczna", "energii słonecznej", "energię słoneczną", 
+    "elektrownie wiatrowe", "elektrowni wiatrowych", "elektrowniom wiatrowym", "fotowoltaika", "fotowoltaiki", "fotowoltaice",
+    "farmy wiatrowe", "farm wiatrowych", "farmom wiatrowym", 
+    "biogaz", "biogazu", "biogazem", 
+    "energia geotermalna", "energii geotermalnej", "energię geotermalną", 
+    "elektromobilność", "elektromobilności", 
+    "transformacja energetyczna", "transformacji energetycznej", 
+    "neutralność klimatyczna", "neutralności klimatycznej", 
+    "emisje CO2", "emisji CO2", "emisjom CO2", 
+    "ślad węglowy", "śladu węglowego", "śladem węglowym", 
+    "efektywność energetyczna", "efektywności energetycznej", "ETS",
+    "panele słoneczne", "paneli słonecznych", "panelom słonecznym", 
+    "sieci energetyczne", "sieci energetycznych", "sieciom energetycznym", 
+    "magazynowanie energii", "magazynowania energii", "magazynowaniu energii", 
+    "akumulatory", "akumulatorów", "akumulatorom", 
+    "zielona energia", "zielonej energii", "zieloną energię", 
+    "zielony wodór", "zielonego wodoru", "zielonym wodorem", 
+    "hydroelektryczność", "hydroelektryczności", 
+    "gaz łupkowy", "gazu łupkowego", "gazem łupkowym", 
+    "energia jądrowa", "energii jądrowej", "energię jądrową", 
+    "reaktory modularne", "reaktorów modularnych", "reaktorom modularnym", 
+    "polska energetyka", "polskiej energetyki", "polskiej energetyce", 
+    "globalne ocieplenie", "globalnego ocieplenia", "globalnemu ociepleniu", 
+    "zmiany klimatyczne", "zmian klimatycznych", "zmianom klimatycznym", 
+    "emisje metanu", "emisji metanu", "emisjom metanu", 
+    "zrównoważony rozwój", "zrównoważonego rozwoju", "zrównoważonemu rozwojowi", 
+    "gospodarka w obiegu zamkniętym", "gospodarki w obiegu zamkniętym", "gospodarce w obiegu zamkniętym", 
+    "inteligentne sieci", "inteligentnych sieci", "inteligentnym sieciom", 
+    "elektrownie atomowe", "elektrowni atomowych", "elektrowniom atomowym", 
+    "reaktory jądrowe", "reaktorów jądrowych", "reaktorom jądrowym", 
+    "farmy fotowoltaiczne", "farm fotowoltaicznych", "farmom fotowoltaicznym", 
+    "dekarbonizacja", "dekarbonizacji", 
+    "recykling energii", "recyklingu energii", "recyklingowi energii", 
+    "polityka klimatyczna", "polityki klimatycznej", "polityce klimatycznej", 
+    "konwencjonalne źródła energii", "konwencjonalnych źródeł energii", "konwencjonalnym źródłom energii", 
+    "odnawialna energia", "odnawialnej energii", "odnawialną energię", 
+    "międzynarodowe porozumienia klimatyczne", "międzynarodowych porozumień klimatycznych", "międzynarodowym porozumieniom klimatycznym", 
+    "efektywność zasobowa", "efektywności zasobowej", 
+    "gospodarka niskoemisyjna", "gospodarki niskoemisyjnej", 
+    "regulacje środowiskowe", "regulacji środowiskowych", "regulacjom środowiskowym", 
+    "konwencje chemiczne", "konwencji chemicznych", "konwencjom chemicznym", 
+    "substancje chemiczne", "substancji chemicznych", "substancjom chemicznym", 
+    "regulacje REACH", "regulacji REACH", "regulacjom REACH", 
+    "substancje toksyczne", "substancji toksycznych", "substancjom toksycznym", 
+    "zanieczyszczenie powietrza", "zanieczyszczenia powietrza", "zanieczyszczeniu powietrza", 
+    "normy emisji", "norm emisji", "normom emisji", 
+    "paliwa alternatywne", "paliw alternatywnych", "paliwom alternatywnym", 
+    "paliwa kopalniane", "paliw kopalnianych", "paliwom kopalnianym", 
+    "kryzys energetyczny", "kryzysu energetycznego", "kryzysowi energetycznemu", 
+    "bezpieczeństwo energetyczne", "bezpieczeństwa energetycznego", "bezpieczeństwu energetycznemu", 
+    "ceny energii", "cen energii", "cenom energii", 
+    "taryfy energetyczne", "taryf energetycznych", "taryfom energetycznym", 
+    "polska polityka energetyczna", "polskiej polityki energetycznej", "polskiej polityce energetycznej", 
+    "elektrownie węglowe", "elektrowni węglowych", "elektrowniom węglowym", 
+    "zamknięcie kopalni", "zamknięcia kopalni", "zamknięciu kopalni", 
+    "transformacja węglowa", "transformacji węglowej", 
+    "pompy ciepła", "pomp ciepła", "pompom ciepła", 
+    "ogrzewanie elektryczne", "ogrzewania elektrycznego", "ogrzewaniu elektrycznemu", 
+    "technologie niskoemisyjne", "technologii niskoemisyjnych", "technologiom niskoemisyjnym", 
+    "infrastruktura energetyczna", "infrastruktury energetycznej", "infrastrukturze energetycznej", 
+    "sieci przesyłowe", "sieci przesyłowych", "sieciom przesyłowym", 
+    "polskie farmy wiatrowe", "polskich farm wiatrowych", "polskim farmom wiatrowym", 
+    "zielony ład", "zielonego ładu", "zielonemu ładowi", 
+    "energetyka konwencjonalna", "energetyki konwencjonalnej", "energetyce konwencjonalnej", 
+    "regulacje energetyczne", "regulacji energetycznych", "regulacjom energetycznym", 
+    "smog", "smogu", "smogiem", 
+    "oczyszczanie powietrza", "oczyszczania powietrza", "oczyszczaniu powietrza", 
+    "technologie OZE", "technologii OZE", "technologiom OZE", 
+    "fundusze klimatyczne", "funduszy klimatycznych", "funduszom klimatycznym", 
+    "zielone inwestycje", "zielonych inwestycji", "zielonym inwestycjom", 
+    "ESG", "ekorozwój", "ekorozwoju", 
+    "certyfikaty CO2", "certyfikatów CO2", "certyfikatom CO2", 
+    "ETS", "system handlu emisjami", "systemu handlu emisjami", "systemowi handlu emisjami", 
+    "odnawialne paliwa", "odnawialnych paliw", "odnawialnym paliwom", 
+    "produkcja energii", "produkcji energii", "produkcję energii", 
+    "polityka środowiskowa", "polityki środowiskowej", "polityce środowiskowej", 
+    "adaptacja klimatyczna", "adaptacji klimatycznej", 
+    "przetwarzanie odpadów", "przetwarzania odpadów", "przetwarzaniu odpadów", 
+    "energetyka morska", "energetyki morskiej", "energetyce morskiej", 
+    "biopaliwa", "biopaliw", "biopaliwom", 
+    "zmniejszenie emisji", "zmniejszenia emisji", "zmniejszeniu emisji", 
+    "zeroemisyjność", "zeroemisyjności", 
+    "modernizacja energetyczna", "modernizacji energetycznej", 
+    "nowe technologie energetyczne", "nowych technologii energetycznych", "nowym technologiom energetycznym"
+]
+
+# Common Polish inflection endings, folded like the keywords they are
+# stripped from, longest first. Stemming a phrase strips one of them from
+# every word, so a single listed form also matches the other cases.
+_ENDINGS = sorted({fold(ending) for ending in [
+    'ami', 'ach', 'ego', 'emu', 'ych', 'ymi', 'ich', 'imi', 'owi', 'om', 'ów', 'ej', 'ym', 'im',
+    'ie', 'ią', 'ię', 'a', 'e', 'i', 'y', 'u', 'o', 'ą', 'ę',
+]}, key=lambda ending: (-len(ending), ending))
+_MIN_STEM = 4
+
+# Atoms separating the words of a phrase: after a word kept as is, and after
+# a stemmed word, which may then carry any of the (folded) endings
+_SPACE = ' '
+_STEMMED_SPACE = '\x00'
+_ENDING_PATTERN = '(?:' + '|'.join(re.escape(ending) for ending in _ENDINGS) + ')?'
+
+
+def stem(word):
+    for ending in _ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= _MIN_STEM:
+            return word[:-len(ending)]
+    return word
+
+
+class KeywordMatcher:
+    # Fold, deduplicate and compile keywords into a single regex. Keywords
+    # match at the start of a word and as prefixes ("wiatr" finds "wiatraki");
+    # with stem=True every word of a phrase is stemmed first, and the words
+    # that lost an ending may carry any other one, so "farmy wiatrowe" also
+    # finds "farmach wiatrowych".
+    def __init__(self, keywords, stem_words=False):
+        self.stem_words = stem_words
+        self.keywords = sorted({self._normalize(keyword) for keyword in keywords if keyword.strip()})
+        self.pattern = re.compile(r'(?<!\w)' + self._trie_pattern(self._build_trie(self.keywords))) if self.keywords else None
+
+    def _normalize(self, keyword):
+        words = fold(keyword).split()
+        if not self.stem_words:
+            return _SPACE.join(words)
+        parts = []
+        for word in words[:-1]:
+            stemmed = stem(word)
+            parts.append(stemmed + (_STEMMED_SPACE if stemmed != word else _SPACE))
+        return ''.join(parts) + stem(words[-1])
+
+    # A keyword that extends another one can never add a match, so the trie
+    # stops at the first complete keyword on each path
+    @staticmethod
+    def _build_trie(keywords):
+        trie = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                if '' in node:
+                    break
+                node = node.setdefault(char, {})
+            else:
+                node.clear()
+                node[''] = True
+        return trie
+
+    def _trie_pattern(self, node):
+        if '' in node:
+            return ''
+        separators = {_SPACE: r'\s+', _STEMMED_SPACE: _ENDING_PATTERN + r'\s+'}
+        alternatives = [
+            separators.get(char, re.escape(char)) + self._trie_pattern(child)
+            for char, child in sorted(node.items())
+        ]
+        if len(alternatives) == 1:
+            return alternatives[0]
+        return '(?:' + '|'.join(alternatives) + ')'
+
+    # text must already be folded
+    def search(self, text):
+        return self.pattern is not None and self.pattern.search(text) is not None
+
+
+# One matcher per filter tag: the original checkboxes plus the sector set
+tag_matchers = {keyword: KeywordMatcher(keyword.split('/')) for keyword in original_keywords}
+tag_matchers['sector'] = KeywordMatcher(sector_keywords, stem_words=True)
+
+
+# Tags of every filter an entry with this title and summary belongs to
+def tag_entry(title, summary):
+    text = fold(f"{title}\n{summary}")
+    return tuple(tag for tag, matcher in tag_matchers.items() if matcher.search(text))
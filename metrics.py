@@ -0,0 +1,183 @@
+import os
+import statistics
+import tempfile
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from feed_cache import feed_cache
+
+# Per-source ingestion metrics. Every fetch of a feed leaves one record with
+# the time spent on each stage, kept in a bounded ring buffer per source, so
+# slow or broken sources can be told apart from a slow network. The records
+# are summarized for the ops page and exported in the Prometheus text format,
+# either over HTTP or as a file for the node exporter textfile collector.
+
+# Fetch records kept per source
+history_size = 100
+
+
+class FetchRecord:
+    __slots__ = ('timestamp', 'fetch_seconds', 'status', 'bytes', 'parse_seconds', 'entries_parsed',
+                 'entries_new', 'summary_seconds', 'date_failures', 'error')
+
+    def __init__(self, fetch_seconds=0.0, status=None, bytes=0, parse_seconds=0.0, entries_parsed=0,
+                 entries_new=0, summary_seconds=0.0, date_failures=0, error=None, timestamp=None):
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.fetch_seconds = fetch_seconds
+        self.status = status
+        self.bytes = bytes
+        self.parse_seconds = parse_seconds
+        self.entries_parsed = entries_parsed
+        self.entries_new = entries_new
+        self.summary_seconds = summary_seconds
+        self.date_failures = date_failures
+        self.error = error
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class FeedMetrics:
+    def __init__(self, size=history_size):
+        self.size = size
+        self._lock = threading.Lock()
+        self._history = {}
+        self._totals = {}
+
+    def record(self, name, record):
+        with self._lock:
+            history = self._history.get(name)
+            if history is None:
+                history = self._history[name] = deque(maxlen=self.size)
+                self._totals[name] = {'fetches': 0, 'errors': 0, 'bytes': 0, 'entries_new': 0, 'date_failures': 0}
+            history.append(record)
+            totals = self._totals[name]
+            totals['fetches'] += 1
+            totals['errors'] += record.error is not None
+            totals['bytes'] += record.bytes
+            totals['entries_new'] += record.entries_new
+            totals['date_failures'] += record.date_failures
+
+    def history(self, name):
+        with self._lock:
+            return list(self._history.get(name, ()))
+
+    def clear(self):
+        with self._lock:
+            self._history.clear()
+            self._totals.clear()
+
+    # One row per source: the last fetch, fetch latency percentiles over the
+    # ring buffer and lifetime totals. Sorted by the slowest sources first.
+    def summary(self):
+        with self._lock:
+            snapshot = {name: (list(history), dict(self._totals[name])) for name, history in self._history.items()}
+        rows = []
+        for name, (history, totals) in snapshot.items():
+            last = history[-1]
+            fetch_times = [record.fetch_seconds for record in history]
+            rows.append({
+                'source': name,
+                'status': last.status,
+                'error': last.error,
+                'last_fetch': last.timestamp,
+                'fetch_p50': statistics.median(fetch_times),
+                'fetch_p95': percentile(fetch_times, 0.95),
+                'parse_seconds': last.parse_seconds,
+                'summary_seconds': last.summary_seconds,
+                'bytes': last.bytes,
+                'entries_parsed': last.entries_parsed,
+                'entries_new': last.entries_new,
+                'date_failures': last.date_failures,
+                **{f'total_{key}': value for key, value in totals.items()},
+            })
+        rows.sort(key=lambda row: row['fetch_p95'], reverse=True)
+        return rows
+
+    def render_prometheus(self):
+        rows = self.summary()
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f'# HELP rss_{name} {help_text}')
+            lines.append(f'# TYPE rss_{name} {kind}')
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{_escape_label(value)}"' for key, value in labels.items())
+                lines.append(f'rss_{name}{{{label_text}}} {value}' if label_text else f'rss_{name} {value}')
+
+        def per_source(key):
+            return [({'source': row['source']}, row[key]) for row in rows]
+
+        metric('fetch_seconds', 'gauge', "Fetch duration quantiles over the recent fetches", [
+            ({'source': row['source'], 'quantile': quantile}, row[key])
+            for row in rows for quantile, key in (('0.5', 'fetch_p50'), ('0.95', 'fetch_p95'))
+        ])
+        metric('last_status', 'gauge', "HTTP status of the last fetch, 0 when none was received",
+               [({'source': row['source']}, row['status'] or 0) for row in rows])
+        metric('last_fetch_timestamp_seconds', 'gauge', "Unix time of the last fetch", per_source('last_fetch'))
+        metric('parse_seconds', 'gauge', "Feed parsing time of the last fetch", per_source('parse_seconds'))
+        metric('summary_seconds', 'gauge', "Summary extraction time of the last fetch", per_source('summary_seconds'))
+        metric('entries_parsed', 'gauge', "Entries in the last fetched feed", per_source('entries_parsed'))
+        metric('fetches_total', 'counter', "Fetches attempted", per_source('total_fetches'))
+        metric('fetch_errors_total', 'counter', "Fetches that failed", per_source('total_errors'))
+        metric('bytes_total', 'counter', "Feed bytes downloaded", per_source('total_bytes'))
+        metric('entries_new_total', 'counter', "Entries not present in the previous fetch", per_source('total_entries_new'))
+        metric('date_failures_total', 'counter', "Published dates that could not be parsed",
+               per_source('total_date_failures'))
+
+        cache = feed_cache.stats()
+        metric('not_modified_total', 'counter', "Fetches answered with 304 Not Modified", [({}, cache['not_modified'])])
+        metric('not_modified_bytes_saved_total', 'counter', "Feed bytes not downloaded thanks to 304 responses",
+               [({}, cache['bytes_saved'])])
+        metric('not_modified_parse_seconds_saved_total', 'counter', "Parse time saved by 304 responses",
+               [({}, cache['parse_seconds_saved'])])
+        return '\n'.join(lines) + '\n'
+
+    # Write the Prometheus text atomically, for the textfile collector or for
+    # an app running in another process
+    def write_metrics(self, path):
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.metrics-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(self.render_prometheus())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    # Serve GET /metrics on a daemon thread. Returns the server; its
+    # shutdown() stops it.
+    def serve_metrics(self, port, host=''):
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+        return server
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+feed_metrics = FeedMetrics()
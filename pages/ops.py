@@ -0,0 +1,55 @@
+import os
+import time
+import streamlit as st
+from feed_cache import feed_cache
+from metrics import feed_metrics
+from poller import metrics_file
+
+# Ingestion health: per-source fetch timings, statuses and parse statistics
+# recorded by the feed poller, slowest sources first. With RSS_EXTERNAL_POLLER
+# the poller runs in another process and its metrics are read from the file
+# named by RSS_METRICS_FILE instead.
+
+st.set_page_config(page_title="Feed health", layout="wide")
+st.title("Feed health")
+
+rows = feed_metrics.summary()
+if rows:
+    now = time.time()
+    st.dataframe(
+        [{
+            'Source': row['source'],
+            'Status': row['error'] or row['status'],
+            'Last fetch (s ago)': round(now - row['last_fetch']),
+            'Fetch p50 (s)': round(row['fetch_p50'], 3),
+            'Fetch p95 (s)': round(row['fetch_p95'], 3),
+            'Parse (s)': round(row['parse_seconds'], 3),
+            'Summaries (s)': round(row['summary_seconds'], 3),
+            'KiB': round(row['bytes'] / 1024, 1),
+            'Entries': row['entries_parsed'],
+            'New': row['entries_new'],
+            'Date failures': row['date_failures'],
+            'Fetches': row['total_fetches'],
+            'Errors': row['total_errors'],
+        } for row in rows],
+        use_container_width=True,
+        hide_index=True,
+    )
+    cache = feed_cache.stats()
+    columns = st.columns(3)
+    columns[0].metric("304 responses", cache['not_modified'])
+    columns[1].metric("MiB saved by 304", round(cache['bytes_saved'] / 2**20, 1))
+    columns[2].metric("Parse seconds saved by 304", round(cache['parse_seconds_saved'], 1))
+    prometheus_text = feed_metrics.render_prometheus()
+elif os.environ.get('RSS_EXTERNAL_POLLER') and metrics_file and os.path.exists(metrics_file):
+    st.caption(f"Metrics of the external poller, written {round(time.time() - os.path.getmtime(metrics_file))} s ago")
+    with open(metrics_file, encoding='utf-8') as f:
+        prometheus_text = f.read()
+else:
+    st.info("No feeds fetched yet.")
+    prometheus_text = None
+
+if prometheus_text:
+    st.download_button("Download metrics", prometheus_text, file_name='rss_metrics.prom', mime='text/plain')
+    with st.expander("Prometheus metrics"):
+        st.code(prometheus_text, language='text')
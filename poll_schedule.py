@@ -0,0 +1,62 @@
+import statistics
+import time
+
+# Per-source poll intervals. Each source is polled at a fraction of the gap
+# between its recent articles, so portals publishing every few minutes are
+# checked often and feeds updated a few times a day are left alone. The
+# interval grows while a source stays quiet for longer than its usual gap
+# (nights, weekends) and is kept within min/max bounds. Per-source minimums
+# (feed_min_intervals in feeds.py) and a feed's own <ttl> are lower bounds;
+# sy:updatePeriod is only used until the source has published enough
+# articles to measure, since many CMSs emit a default "hourly".
+
+min_poll_interval = 120
+max_poll_interval = 3600
+
+# Polls per expected publication gap
+polls_per_gap = 2
+
+# Most recent publication gaps taken into the estimate
+gap_sample = 20
+
+
+class PollSchedule:
+    def __init__(self, default_interval=300, min_interval=min_poll_interval, max_interval=max_poll_interval,
+                 polls_per_gap=polls_per_gap, sample=gap_sample, wall_clock=time.time, min_intervals=None):
+        self.default_interval = default_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.min_intervals = dict(min_intervals or {})
+        self.polls_per_gap = polls_per_gap
+        self.sample = sample
+        self.wall_clock = wall_clock
+
+    def _clamp(self, name, interval):
+        return min(max(interval, self.min_interval, self.min_intervals.get(name, 0)), self.max_interval)
+
+    # Median gap between the newest publication times and the seconds since
+    # the newest one, or (None, None) with fewer than two dated entries
+    def _publication_gaps(self, entries, now):
+        timestamps = sorted(
+            (entry.published_ts for entry in entries if entry.published_ts is not None and entry.published_ts <= now),
+            reverse=True,
+        )[:self.sample + 1]
+        if len(timestamps) < 2:
+            return None, None
+        gaps = [newer - older for newer, older in zip(timestamps, timestamps[1:])]
+        return max(statistics.median(gaps), 1), now - timestamps[0]
+
+    # Seconds until the next poll of a healthy source, given its last result
+    def interval(self, name, result):
+        if not result:
+            return self._clamp(name, self.default_interval)
+        gap, silence = self._publication_gaps(result['entries'], self.wall_clock())
+        if gap is not None:
+            interval = max(gap, silence / 2) / self.polls_per_gap
+        elif result.get('update_period'):
+            interval = result['update_period'] / self.polls_per_gap
+        else:
+            interval = self.default_interval
+        if result.get('ttl'):
+            interval = max(interval, result['ttl'])
+        return self._clamp(name, interval)
@@ -0,0 +1,183 @@
+import argparse
+import logging
+import os
+import random
+import threading
+import time
+
+from feed_cache import feed_cache
+from feeds import sources, fetch_timeout, merge_entries, feed_min_intervals, ThreadPoolBackend
+from snapshot import open_store
+from article_store import open_article_store
+from metrics import feed_metrics
+from poll_schedule import PollSchedule, min_poll_interval, max_poll_interval
+from timeline import Timeline
+
+logger = logging.getLogger(__name__)
+
+# Background ingestion loop. Sources are polled on their own schedule, adapted
+# to how often each one publishes (see poll_schedule.py), failing hosts back
+# off exponentially, and after every round the merged timeline is published to
+# a snapshot store that the UI reads without touching the network.
+
+poll_interval = 300
+max_backoff = 3600
+poll_jitter = 0.1
+
+# 'threads' (urllib on a thread pool) or 'async' (aiohttp with a shared pool)
+fetch_backend = os.environ.get('RSS_FETCH_BACKEND', 'threads')
+
+# SQLite article history shared by the poller and the app
+article_db = os.environ.get('RSS_DB', 'articles.db')
+
+# Prometheus text file rewritten after every round, so the ops page of an app
+# running in another process can show this poller's metrics
+metrics_file = os.environ.get('RSS_METRICS_FILE')
+
+
+def make_backend(name=fetch_backend, timeout=fetch_timeout):
+    if name == 'async':
+        from async_fetch import AsyncFetchBackend
+        return AsyncFetchBackend(timeout=timeout)
+    if name == 'threads':
+        return ThreadPoolBackend(timeout=timeout)
+    raise ValueError(f"Unknown fetch backend {name!r}")
+
+
+class FeedPoller:
+    def __init__(self, sources, store, interval=poll_interval, timeout=fetch_timeout,
+                 jitter=poll_jitter, backoff_limit=max_backoff, backend=None, clock=time.monotonic,
+                 metrics_file=metrics_file, schedule=None):
+        self.sources = dict(sources)
+        self.store = store
+        self.interval = interval
+        self.schedule = schedule or PollSchedule(interval, min_intervals=feed_min_intervals)
+        self.timeline = Timeline()
+        self.jitter = jitter
+        self.backoff_limit = backoff_limit
+        self.backend = backend or make_backend(timeout=timeout)
+        self.clock = clock
+        self.metrics_file = metrics_file
+        self.next_due = {name: 0.0 for name in self.sources}
+        self.failures = {name: 0 for name in self.sources}
+        self.errors = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _delay(self, name, result):
+        if self.failures[name]:
+            delay = min(self.interval * 2 ** self.failures[name], self.backoff_limit)
+        else:
+            delay = self.schedule.interval(name, result)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _record(self, name, result):
+        feed_cache.put(name, result)
+        if result['error']:
+            self.failures[name] += 1
+            self.errors[name] = result['error']
+        else:
+            self.failures[name] = 0
+            self.errors.pop(name, None)
+        self.next_due[name] = self.clock() + self._delay(name, result)
+
+    # Poll every source that is due and publish the merged timeline.
+    # Returns the number of sources polled.
+    def poll_once(self):
+        now = self.clock()
+        due = [name for name, next_due in self.next_due.items() if next_due <= now]
+        if due:
+            results = self.backend.fetch_many((name, self.sources[name], feed_cache.peek(name)) for name in due)
+            for name, result in results.items():
+                self._record(name, result)
+            changed = self.timeline.add(merge_entries(result['entries'] for result in results.values()))
+            self.publish(changed)
+        return len(due)
+
+    # A store keeping its own history only receives the entries that changed
+    # in this round; a snapshot store is given the whole timeline
+    def publish(self, changed=None):
+        if changed is not None and self.store.incremental:
+            self.store.publish(changed, self.errors)
+        else:
+            self.store.publish(self.timeline.latest(), self.errors)
+        if self.metrics_file:
+            try:
+                feed_metrics.write_metrics(self.metrics_file)
+            except OSError:
+                logger.exception("Failed to write metrics to %s", self.metrics_file)
+
+    def seconds_until_due(self):
+        return max(0.0, min(self.next_due.values()) - self.clock())
+
+    def run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception:
+                logger.exception("Feed polling round failed")
+            self._stop.wait(max(1.0, self.seconds_until_due()))
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name='feed-poller', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.backend.close()
+
+
+_poller = None
+_poller_lock = threading.Lock()
+
+
+# Start the process-wide poller on first use; later calls return the same one
+def start_background_poller(store, **kwargs):
+    global _poller
+    with _poller_lock:
+        if _poller is None:
+            _poller = FeedPoller(sources, store, **kwargs).start()
+        return _poller
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Poll RSS sources and publish a snapshot for the Streamlit app.")
+    parser.add_argument('--db', default=article_db, help="SQLite article store shared with the app")
+    parser.add_argument('--snapshot', help="write a pickle snapshot file instead of the SQLite store")
+    parser.add_argument('--interval', type=float, default=poll_interval,
+                        help="seconds between polls of a source whose publication rate is not known yet")
+    parser.add_argument('--min-interval', type=float, default=min_poll_interval, help="shortest adaptive poll interval")
+    parser.add_argument('--max-interval', type=float, default=max_poll_interval, help="longest adaptive poll interval")
+    parser.add_argument('--timeout', type=float, default=fetch_timeout, help="per-feed fetch timeout in seconds")
+    parser.add_argument('--backend', choices=['threads', 'async'], default=fetch_backend, help="fetch engine")
+    parser.add_argument('--once', action='store_true', help="poll every source once and exit")
+    parser.add_argument('--metrics-port', type=int, help="serve Prometheus metrics on this port at /metrics")
+    parser.add_argument('--metrics-file', default=metrics_file, help="rewrite Prometheus metrics to this file after every round")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    backend = make_backend(args.backend, args.timeout)
+    store = open_store(args.snapshot) if args.snapshot else open_article_store(args.db)
+    if args.metrics_port:
+        feed_metrics.serve_metrics(args.metrics_port)
+    schedule = PollSchedule(args.interval, args.min_interval, args.max_interval, min_intervals=feed_min_intervals)
+    poller = FeedPoller(sources, store, interval=args.interval, backend=backend, metrics_file=args.metrics_file,
+                        schedule=schedule)
+    try:
+        if args.once:
+            poller.poll_once()
+        else:
+            poller.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        backend.close()
+
+
+if __name__ == '__main__':
+    main()
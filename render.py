@@ -0,0 +1,83 @@
+import json
+
+# Entries are shipped to the component as one compact JSON array and turned
+# into DOM nodes by the browser a page at a time as the user scrolls, so the
+# first paint only lays out the first page however many entries were sent.
+
+# Entries the browser renders per infinite-scroll step
+scroll_page_size = 30
+
+PAGE_TEMPLATE = '''<html>
+<head>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 0; padding: 0; }
+        .content { padding: 5px; }
+        .entry { border-bottom: 1px solid #ddd; padding: 5px 0; }
+        .title a { text-decoration: none; color: #000; font-weight: bold; font-size: 1.1em; }
+        .summary { margin: 5px 0; font-size: 0.9em; color: #333; }
+        .meta { font-size: 0.8em; color: #777; }
+        .highlight { background-color: yellow; }
+        #sentinel { height: 1px; }
+    </style>
+</head>
+<body>
+    <div class="content" id="content"></div>
+    <div id="sentinel"></div>
+    <script>
+        const ENTRIES = __ENTRIES__;
+        const PAGE_SIZE = __PAGE_SIZE__;
+        const content = document.getElementById("content");
+        let rendered = 0;
+
+        function div(className, text) {
+            const node = document.createElement("div");
+            node.className = className;
+            if (text !== undefined) node.textContent = text;
+            return node;
+        }
+
+        function renderPage() {
+            const fragment = document.createDocumentFragment();
+            const end = Math.min(rendered + PAGE_SIZE, ENTRIES.length);
+            for (; rendered < end; rendered++) {
+                const [title, link, summary, sources, published] = ENTRIES[rendered];
+                const entry = div("entry");
+                const titleNode = div("title");
+                const anchor = document.createElement("a");
+                anchor.href = link;
+                anchor.target = "_blank";
+                anchor.textContent = title;
+                titleNode.appendChild(anchor);
+                entry.appendChild(titleNode);
+                entry.appendChild(div("summary", summary));
+                entry.appendChild(div("meta", sources + " \\u2022 " + published));
+                fragment.appendChild(entry);
+            }
+            content.appendChild(fragment);
+        }
+
+        new IntersectionObserver(function (observed) {
+            if (observed[0].isIntersecting && rendered < ENTRIES.length) renderPage();
+        }, { rootMargin: "600px" }).observe(document.getElementById("sentinel"));
+        renderPage();
+    </script>
+</body>
+</html>
+'''
+
+
+def entry_payload(entry, sources):
+    return [entry.title, entry.link, entry.summary, ', '.join(sources), entry.published_str]
+
+
+# Serialize (entry, sources) pairs for an inline <script>; escaping "</"
+# keeps article text from closing the script element
+def entries_json(stories):
+    payload = json.dumps([entry_payload(entry, sources) for entry, sources in stories],
+                         ensure_ascii=False, separators=(',', ':'))
+    return payload.replace('</', '<\\/')
+
+
+def display_entries(stories, page_size=scroll_page_size):
+    head, tail = PAGE_TEMPLATE.split('__ENTRIES__')
+    return ''.join((head, entries_json(stories), tail.replace('__PAGE_SIZE__', str(page_size))))
@@ -0,0 +1,133 @@
+import bisect
+import re
+import threading
+import unicodedata
+
+# Inverted index over the normalized title and summary of every entry. Each
+# entry is tokenized once, when it first reaches the process; text searches
+# are then answered with set operations over the posting lists instead of
+# rescanning every entry's text.
+
+_TOKEN_RE = re.compile(r'\w+')
+
+# Letters that do not decompose under NFKD but should fold like diacritics
+_FOLD_TABLE = str.maketrans({'ł': 'l', 'Ł': 'l', 'ß': 'ss'})
+
+
+# Lowercase and strip diacritics, so "Wodór", "wodor" and "WODÓR" compare equal
+def fold(text):
+    text = text.translate(_FOLD_TABLE).lower()
+    if text.isascii():
+        return text
+    return ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(fold(text))
+
+
+def entry_id(entry):
+    return entry.link
+
+
+class SearchIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = {}
+        self._texts = {}
+        self._sorted_tokens = []
+        self._dirty = False
+        self._synced_entries = None
+
+    def __len__(self):
+        return len(self._texts)
+
+    # Index entries that are not indexed yet; returns how many were added
+    def update(self, entries):
+        added = 0
+        with self._lock:
+            for entry in entries:
+                doc_id = entry_id(entry)
+                if doc_id in self._texts:
+                    continue
+                text = fold(f"{entry.title}\n{entry.summary}")
+                self._texts[doc_id] = text
+                for token in set(_TOKEN_RE.findall(text)):
+                    postings = self._postings.get(token)
+                    if postings is None:
+                        self._postings[token] = postings = set()
+                        self._dirty = True
+                    postings.add(doc_id)
+                added += 1
+        return added
+
+    # Drop entries that are no longer shown, so the index follows the window
+    def retain(self, doc_ids):
+        with self._lock:
+            stale = self._texts.keys() - set(doc_ids)
+            for doc_id in stale:
+                for token in set(_TOKEN_RE.findall(self._texts.pop(doc_id))):
+                    postings = self._postings[token]
+                    postings.discard(doc_id)
+                    if not postings:
+                        del self._postings[token]
+                        self._dirty = True
+        return len(stale)
+
+    # Make the index match entries exactly. Re-syncing the same list (an
+    # unchanged snapshot on a rerun) is free.
+    def sync(self, entries):
+        if entries is self._synced_entries:
+            return
+        self.update(entries)
+        self.retain(entry_id(entry) for entry in entries)
+        self._synced_entries = entries
+
+    def _prefix_postings(self, prefix):
+        if self._dirty:
+            self._sorted_tokens = sorted(self._postings)
+            self._dirty = False
+        matches = set()
+        start = bisect.bisect_left(self._sorted_tokens, prefix)
+        for token in self._sorted_tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            matches |= self._postings[token]
+        return matches
+
+    # Ids of entries containing phrase. Every word matches as a prefix
+    # ("energetyk" finds "energetyka"); multi-word phrases are intersected
+    # through the index and then checked against the folded text.
+    def search(self, phrase):
+        folded = fold(phrase).strip()
+        tokens = _TOKEN_RE.findall(folded)
+        if not tokens:
+            return set()
+        with self._lock:
+            candidates = None
+            for token in sorted(tokens, key=len, reverse=True):
+                postings = self._prefix_postings(token)
+                candidates = postings if candidates is None else candidates & postings
+                if not candidates:
+                    return set()
+            if len(tokens) == 1:
+                return candidates
+            return {doc_id for doc_id in candidates if folded in self._texts[doc_id]}
+
+
+# Apply the page filters: an empty source selection shows every source, an
+# entry passes the keyword filter when it carries any selected tag (computed
+# at ingestion), and the custom text is looked up in the index
+def filter_entries(entries, index, selected_sources=(), tags=(), custom_text=''):
+    matching = index.search(custom_text) if custom_text.strip() else None
+    selected_sources = set(selected_sources)
+    tags = set(tags)
+    return [
+        entry for entry in entries
+        if (not selected_sources or entry.source in selected_sources)
+        and (not tags or not tags.isdisjoint(entry.tags))
+        and (matching is None or entry_id(entry) in matching)
+    ]
+
+
+search_index = SearchIndex()
@@ -0,0 +1,79 @@
+import os
+import pickle
+import tempfile
+import threading
+import time
+
+# Shared store for the merged entry list published by the poller. The UI only
+# ever reads the latest snapshot, so rendering never waits on the network.
+# With a path the snapshot is also written to disk, which lets a poller
+# running as its own process feed any number of Streamlit processes.
+
+
+class Snapshot:
+    def __init__(self, entries=(), errors=None, published_at=None):
+        self.entries = list(entries)
+        self.errors = dict(errors or {})
+        self.published_at = published_at
+
+
+class SnapshotStore:
+    # publish() replaces the whole snapshot
+    incremental = False
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._snapshot = Snapshot()
+        self._loaded_mtime = None
+
+    def publish(self, entries, errors=None):
+        snapshot = Snapshot(entries, errors, time.time())
+        with self._lock:
+            self._snapshot = snapshot
+        if self.path:
+            self._write(snapshot)
+
+    def snapshot(self):
+        if self.path:
+            self._reload()
+        with self._lock:
+            return self._snapshot
+
+    # Write to a temporary file and rename it, so readers never see a
+    # partially written snapshot
+    def _write(self, snapshot):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _reload(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._loaded_mtime:
+            return
+        with open(self.path, 'rb') as f:
+            snapshot = pickle.load(f)
+        with self._lock:
+            self._snapshot = snapshot
+            self._loaded_mtime = mtime
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+# Return the process-wide store for path (None for the in-memory store)
+def open_store(path=None):
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = SnapshotStore(path)
+        return _stores[path]
@@ -0,0 +1,62 @@
+from entry import Entry
+from poll_schedule import PollSchedule
+
+NOW = 1_700_000_000
+
+
+def entries(*ages):
+    return [Entry(f'Article {i}', f'https://example.pl/{i}', '', 'Source', NOW - age) for i, age in enumerate(ages)]
+
+
+def schedule(**kwargs):
+    kwargs.setdefault('min_interval', 10)
+    kwargs.setdefault('max_interval', 7200)
+    return PollSchedule(default_interval=300, wall_clock=lambda: NOW, **kwargs)
+
+
+def test_no_result_uses_default_interval():
+    assert schedule().interval('Source', None) == 300
+
+
+def test_fast_source_is_polled_at_a_fraction_of_its_gap():
+    result = {'entries': entries(0, 60, 120, 180)}
+    assert schedule().interval('Source', result) == 30
+
+
+def test_quiet_source_backs_off_with_its_silence():
+    result = {'entries': entries(4000, 4600, 5200, 5800)}
+    assert schedule().interval('Source', result) == 1000
+
+
+def test_entries_dated_in_the_future_are_ignored():
+    result = {'entries': entries(-3600, 0, 600, 1200)}
+    assert schedule().interval('Source', result) == 300
+
+
+def test_update_period_is_used_until_gaps_can_be_measured():
+    result = {'entries': entries(0), 'update_period': 1800}
+    assert schedule().interval('Source', result) == 900
+
+
+def test_measured_gaps_take_precedence_over_update_period():
+    result = {'entries': entries(0, 60, 120), 'update_period': 3600}
+    assert schedule().interval('Source', result) == 30
+
+
+def test_ttl_is_a_lower_bound():
+    result = {'entries': entries(0, 60, 120), 'ttl': 600}
+    assert schedule().interval('Source', result) == 600
+
+
+def test_interval_is_clamped_to_min_and_max():
+    fast = {'entries': entries(0, 60, 120)}
+    quiet = {'entries': entries(0, 86400, 172800)}
+    assert schedule(min_interval=120).interval('Source', fast) == 120
+    assert schedule(max_interval=3600).interval('Source', quiet) == 3600
+
+
+def test_per_source_minimum():
+    result = {'entries': entries(0, 60, 120)}
+    paced = schedule(min_intervals={'Source': 900})
+    assert paced.interval('Source', result) == 900
+    assert paced.interval('Other', result) == 30
@@ -0,0 +1,90 @@
+import threading
+from bisect import bisect_left, bisect_right
+from itertools import count, islice
+
+from entry import sort_key
+
+# Merged timeline kept sorted across polling rounds. Entries are indexed by
+# link and source; each round only inserts the entries that were not there
+# before (or moves those whose publication time changed), so a refresh costs
+# a binary search per polled entry instead of re-sorting every article, and
+# the newest N entries are a slice of the index rather than a new list.
+
+# Entries kept in the timeline; the oldest are dropped beyond this
+timeline_limit = 2000
+
+
+# The same link carried by two sources stays two entries, as in merge_entries
+def _entry_id(entry):
+    return entry.link, entry.source
+
+
+class Timeline:
+    def __init__(self, limit=timeline_limit):
+        self.limit = limit
+        self._lock = threading.Lock()
+        # Ascending (-sort_key, sequence) keys, parallel to _entries, so the
+        # newest entry comes first and equal times keep their insertion order
+        self._keys = []
+        self._entries = []
+        self._keys_by_id = {}
+        self._sequence = count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    # Add entries (newest first, as merge_entries returns them). A known entry
+    # is replaced in place, or moved if its time changed. Returns the entries
+    # that were inserted or replaced by a new object, which is all a store
+    # keeping its own history has to write.
+    def add(self, entries):
+        changed = []
+        with self._lock:
+            if not self._entries:
+                for entry in entries:
+                    if _entry_id(entry) not in self._keys_by_id:
+                        self._append(entry)
+                        changed.append(entry)
+            else:
+                for entry in entries:
+                    key = self._keys_by_id.get(_entry_id(entry))
+                    if key is not None:
+                        index = bisect_left(self._keys, key)
+                        if key[0] == -sort_key(entry):
+                            if self._entries[index] is not entry:
+                                self._entries[index] = entry
+                                changed.append(entry)
+                            continue
+                        del self._keys[index]
+                        del self._entries[index]
+                    self._insert(entry)
+                    changed.append(entry)
+            self._trim()
+        return changed
+
+    def _append(self, entry):
+        key = (-sort_key(entry), next(self._sequence))
+        self._keys.append(key)
+        self._entries.append(entry)
+        self._keys_by_id[_entry_id(entry)] = key
+
+    def _insert(self, entry):
+        key = (-sort_key(entry), next(self._sequence))
+        index = bisect_right(self._keys, key)
+        self._keys.insert(index, key)
+        self._entries.insert(index, entry)
+        self._keys_by_id[_entry_id(entry)] = key
+
+    def _trim(self):
+        if len(self._entries) > self.limit:
+            for entry in self._entries[self.limit:]:
+                del self._keys_by_id[_entry_id(entry)]
+            del self._keys[self.limit:]
+            del self._entries[self.limit:]
+
+    # The newest n entries (all of them without n), optionally of one source
+    def latest(self, n=None, source=None):
+        with self._lock:
+            if source is None:
+                return self._entries[:n]
+            return list(islice((entry for entry in self._entries if entry.source == source), n))